@@ -1,21 +1,33 @@
 #!/usr/bin/env python
 import argparse
+import itertools
 
 import pandas as pd
+from rl_rpsr.results import error_stats, is_results_file, read_results
+
+
+def iter_chunks(filename, chunksize):
+    """Generator of DataFrame chunks with one return column per model."""
+    if is_results_file(filename):
+        for chunk in read_results(filename):
+            yield pd.DataFrame(chunk[list(chunk.dtype.names[4:])])
+    else:
+        yield from pd.read_csv(
+            filename, sep=' ', index_col=False, chunksize=chunksize
+        )
 
 
 def main_eval(args):
-    results = pd.read_csv(args.results, sep=' ', index_col=False)
+    chunks = iter_chunks(args.results, args.chunksize)
+    first = next(chunks)
+    stats = error_stats(itertools.chain([first], chunks), list(first))
 
-    results_baseline = results.iloc[:, 0]
-    errors = pd.DataFrame(
-        {name: results_baseline - results[name] for name in results.columns}
-    )
-    MSE = errors.pow(2).mean().pow(0.5)
+    # columns without any valid error, e.g. models never evaluated
+    columns = [name for name in stats if stats[name].count > 0]
 
-    # print(' '.join(results.columns))
-    for name in results.columns:
-        print(f'{MSE[name]: .3f}', end=' ')
+    # print(' '.join(columns))
+    for name in columns:
+        print(f'{stats[name].rms(): .3f}', end=' ')
     print()
 
 
@@ -23,6 +35,7 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('pomdp')
     parser.add_argument('results')
+    parser.add_argument('--chunksize', type=int, default=100_000)
 
     main_eval(parser.parse_args())
 
@@ -1,23 +1,98 @@
 #!/usr/bin/env python
 import argparse
+from collections import defaultdict
 
 import pandas as pd
+from rl_rpsr.results import OnlineStats, is_results_file, read_results
 
 
-def main_table(args):
+def iter_chunks(filename, chunksize):
+    """Generator of long-format DataFrame chunks, one return per row."""
     names = 'pomdp', 'env_model', 'policy_model', 'eval_model', 'return'
-    df = pd.read_csv(args.filename, sep=' ', header=None, names=names)
-    df = df[df['env_model'] == 'rpsr']
-    del df['env_model']
-
-    df.rename(
-        columns={
-            'pomdp': 'Domain',
-            'eval_model': 'Model',
-            'policy_model': 'Policy',
-        },
-        inplace=True,
+
+    if is_results_file(filename):
+        for chunk in read_results(filename):
+            df = pd.DataFrame(
+                {
+                    'pomdp': chunk['pomdp'],
+                    'env_model': chunk['env'],
+                    'policy_model': chunk['policy'],
+                    'simulation': chunk['simulation'],
+                }
+            )
+            for eval_model in chunk.dtype.names[4:]:
+                yield df.assign(
+                    eval_model=eval_model, **{'return': chunk[eval_model]}
+                ).dropna(subset=['return'])
+    else:
+        yield from pd.read_csv(
+            filename, sep=' ', header=None, names=names, chunksize=chunksize
+        )
+
+
+def paired_differences(filename, chunksize, baseline):
+    """Generator of long-format chunks of the return differences from
+    `baseline`.
+
+    Returns are paired by simulation index, i.e. by the common random numbers
+    of runs with the same `--seed`, so the differences have a lower variance
+    than the returns themselves.  The file is read twice, first for the
+    baseline returns, which must be unique, and then chunk by chunk.
+    """
+    if not is_results_file(filename):
+        raise ValueError('paired differences require a results file')
+
+    keys = ['pomdp', 'env_model', 'eval_model', 'simulation']
+    returns_baseline = pd.concat(
+        [
+            df.loc[df['policy_model'] == baseline, keys + ['return']]
+            for df in iter_chunks(filename, chunksize)
+        ],
+        ignore_index=True,
+    )
+    if returns_baseline.empty:
+        raise ValueError(f'no returns of the baseline policy {baseline}')
+
+    try:
+        returns_baseline = returns_baseline.set_index(
+            keys, verify_integrity=True
+        )
+    except ValueError as e:
+        # e.g. the same run appended twice, which makes the pairs ambiguous
+        raise ValueError(
+            f'duplicate returns of the baseline policy {baseline}'
+        ) from e
+
+    returns_baseline = returns_baseline['return'].rename('baseline')
+    for df in iter_chunks(filename, chunksize):
+        df = df.join(returns_baseline, on=keys)
+        df['return'] -= df['baseline']
+        yield df.dropna(subset=['return'])
+
+
+def main_table(args):
+    if args.paired is None:
+        chunks = iter_chunks(args.filename, args.chunksize)
+    else:
+        chunks = paired_differences(args.filename, args.chunksize, args.paired)
+
+    stats = defaultdict(OnlineStats)
+    for df in chunks:
+        df = df[df['env_model'] == 'rpsr']
+        grouped = df.groupby(['pomdp', 'eval_model', 'policy_model'])
+        for key, returns in grouped['return']:
+            stats[key].update(returns.to_numpy())
+
+    index = pd.MultiIndex.from_tuples(
+        stats.keys(), names=['Domain', 'Model', 'Policy']
     )
+    df = pd.DataFrame(
+        {
+            'mean': [s.mean for s in stats.values()],
+            'std': [s.std() for s in stats.values()],
+        },
+        index=index,
+    ).reset_index()
 
     df['Domain'] = df['Domain'].str.replace('.pomdp', '')
     df['Domain'] = df['Domain'].str.replace('.POMDP', '')
@@ -27,13 +102,18 @@ def main_table(args):
         {'random': 'Random', 'bsr': 'POMDP', 'psr': 'PSR', 'rpsr': 'R-PSR'},
     )
 
-    grouped = df.groupby(['Domain', 'Model', 'Policy'])
-    mean = grouped['return'].mean()
-    std = grouped['return'].std()
+    # exact returns, e.g. of `rl-rrpsr-eval.py --exact`, are a single row per
+    # group, hence without a standard deviation
+    exact = df['std'].isna().all()
 
-    stats = pd.DataFrame({'mean': mean, 'std': std})
+    stats = df.set_index(['Domain', 'Model', 'Policy']).sort_index()
     stats = stats.agg(
-        lambda data: f'{data["mean"]:.1f} \pm {data["std"]:.1f}', axis=1
+        lambda data: (
+            f'{data["mean"]:.1f}'
+            if pd.isna(data['std'])
+            else f'{data["mean"]:.1f} \pm {data["std"]:.1f}'
+        ),
+        axis=1,
     )
 
     stats = stats.unstack()
@@ -45,9 +125,22 @@ def main_table(args):
     pomdp = pomdp.replace('.POMDP', '')
     pomdp = pomdp.replace('.95', '')
 
+    caption = f'Policy return estimates, \emph{{{pomdp}}}.'
+    if args.paired is not None:
+        pairing = '' if exact else ', paired by episode'
+        caption = (
+            f'Policy return differences from the {args.paired} policy'
+            f'{pairing}, \emph{{{pomdp}}}.'
+        )
+
+    if exact:
+        caption = f'{caption} For each policy (columns), the expected return is computed exactly by each model (rows).'
+    else:
+        caption = f'{caption} For each policy (columns), $1000$ episodes of $100$ steps are evaluated by each model (rows).  Means and standard deviations shown as $\\mu\\pm\\sigma$.'
+
     print(
         stats.to_latex(
-            caption=f'Policy return estimates, \emph{{{pomdp}}}. For each policy (columns), $1000$ episodes of $100$ steps are evaluated by each model (rows).  Means and standard deviations shown as $\\mu\\pm\\sigma$.',
+            caption=caption,
             label=f'tab:results:{pomdp}',
             index=False,
             header=[f'{{{col}}}' for col in stats.columns],
@@ -60,6 +153,13 @@ def main_table(args):
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('filename')
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument(
+        '--paired',
+        choices=['random', 'bsr', 'psr', 'rpsr'],
+        default=None,
+        help='baseline policy of paired return differences',
+    )
     main_table(parser.parse_args())
 
 
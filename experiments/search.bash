@@ -7,11 +7,15 @@ shift
 
 mkdir -p cores/ logs/
 
-core_filename=cores/$pomdp.$model.core
 log_filename=logs/search.$pomdp.$model.log
 
 cmd_options=()
-cmd_options+=(--save-core $core_filename)
+if [ $model == joint ]; then
+  cmd_options+=(--save-core-psr cores/$pomdp.psr.core)
+  cmd_options+=(--save-core-rpsr cores/$pomdp.rpsr.core)
+else
+  cmd_options+=(--save-core cores/$pomdp.$model.core)
+fi
 cmd_options+=(--log-filename $log_filename --log-level DEBUG)
 
 rl-psr-search.py pomdps/$pomdp $model ${cmd_options[@]} $@
@@ -1,18 +1,30 @@
 from __future__ import annotations
 
-from gym_pomdps.belief import belief_step, expected_obs, expected_reward
+import copy
+
+import numpy as np
+from rl_rpsr.linalg import grouped_vecmat
 from rl_rpsr.pomdp import POMDP_Model
 
 __all__ = ['BSR_Model']
 
 
 class BSR_Model:
+    # arrays which propagate the states, see `astype`
+    DYNAMICS_ARRAYS = ('M_aoS', 'm_ao', 'R', 'start')
+
     def __init__(self, pomdp_model: POMDP_Model):
         self.pomdp_model = pomdp_model
 
         self.R = pomdp_model.R
         self.G = pomdp_model.G
 
+        # (|A|, |O|, |S|, |S|) view, M_{aoS} = G_{ao}^\top
+        self.M_aoS = self.G.transpose(0, 1, 3, 2)
+
+        # (|A|, |O|, |S|) array, m_{ao} = G_{ao}^\top 1
+        self.m_ao = self.G.sum(2)
+
         self.discount = pomdp_model.discount
         self.actions = pomdp_model.actions
         self.observations = pomdp_model.observations
@@ -25,11 +37,74 @@ class BSR_Model:
 
         self.rank = self.state_space.n
 
+    def astype(self, dtype) -> BSR_Model:
+        """Copy of the model which propagates states in `dtype`.
+
+        The model itself is returned if no cast is needed.
+        """
+        if all(
+            getattr(self, name).dtype == dtype for name in self.DYNAMICS_ARRAYS
+        ):
+            return self
+
+        model = copy.copy(self)
+        for name in self.DYNAMICS_ARRAYS:
+            setattr(model, name, getattr(self, name).astype(dtype))
+
+        return model
+
+    def project(self, state):  # pylint: disable=no-self-use
+        """Project `state` onto the belief simplex.
+
+        Valid beliefs, i.e. nonnegative and normalized within rounding
+        errors, are returned unchanged.
+        """
+        tol = np.sqrt(np.finfo(state.dtype).eps)
+        if (state >= 0.0).all() and abs(state.sum() - 1.0) <= tol:
+            return state
+
+        belief = np.clip(state, 0.0, None)
+        total = belief.sum()
+        if total <= 0.0:
+            return state
+
+        return belief / total
+
+    def normalize(self, state):  # pylint: disable=no-self-use
+        """Rescale `state` so that it sums to 1, in float64."""
+        state64 = state.astype(np.float64, copy=False)
+        total = state64.sum()
+        if total <= 0.0:
+            return state
+
+        return (state64 / total).astype(state.dtype, copy=False)
+
+    @property
+    def transitions(self):
+        """(|A|, |O|, |S|, |S|) unnormalized `dynamics` matrices."""
+        return self.M_aoS
+
     def dynamics(self, state, action, observation):
-        return belief_step(self.pomdp_model.env, state, action, observation)
+        M = self.M_aoS[action, observation]
+        m = self.m_ao[action, observation]
+        return (state @ M) / (state @ m)
 
     def observation_probs(self, state, action):
-        return expected_obs(self.pomdp_model.env, state, action)
+        return state @ self.m_ao[action, :, :].T
 
     def expected_reward(self, state, action):
-        return expected_reward(self.pomdp_model.env, state, action)
+        return state @ self.R[:, action]
+
+    def dynamics_batch(self, states, actions, observations):
+        """Batched `dynamics`, with (K, |S|) `states` and (K,) indices."""
+        M = grouped_vecmat(states, self.M_aoS, actions, observations)
+        m = np.einsum('ki,ki->k', states, self.m_ao[actions, observations])
+        return M / m[:, None]
+
+    def observation_probs_batch(self, states, actions):
+        """Batched `observation_probs`, returns a (K, |O|) array."""
+        return np.einsum('ki,koi->ko', states, self.m_ao[actions])
+
+    def expected_reward_batch(self, states, actions):
+        """Batched `expected_reward`, returns a (K,) array."""
+        return np.einsum('ki,ik->k', states, self.R[:, actions])
@@ -6,7 +6,7 @@ from rl_rpsr.linalg import cross_sum
 from rl_rpsr.pruning import inc_prune, purge
 from rl_rpsr.util import VI_Type
 from rl_rpsr.value_function import Alpha, ValueFunction
-from rl_rpsr.value_iteration import VI_Algo
+from rl_rpsr.value_iteration import VI_Algo, inc_pruning_error
 
 from .model import BSR_Model
 
@@ -49,6 +49,9 @@ class VI_Enum(VI_Algo):
 
         I = np.eye(model.rank)
 
+        error_bound = self.error_bound(model, vf, **kwargs)
+        kwargs = self.purge_kwargs(**kwargs)
+
         alphas = vf.alphas
         alphas = [
             _make_alpha(model, a, next_alphas)
@@ -59,7 +62,7 @@ class VI_Enum(VI_Algo):
         ]
 
         alphas = purge(alphas, I, key=lambda alpha: alpha.vector, **kwargs)
-        return ValueFunction(alphas, vf.horizon + 1)
+        return ValueFunction(alphas, vf.horizon + 1, error_bound)
 
 
 class VI_IncPruning(VI_Algo):
@@ -67,12 +70,22 @@ class VI_IncPruning(VI_Algo):
         super().__init__()
         self.true_inc_pruning = true_inc_pruning
 
+    def prune_error(
+        self, model, eps: float = 0.0, dedup_tol: float = 0.0, **kwargs
+    ) -> float:
+        return inc_pruning_error(
+            model.observation_space.n, eps + dedup_tol, self.true_inc_pruning
+        )
+
     def iterate(
         self, model: BSR_Model, vf: ValueFunction, **kwargs
     ) -> ValueFunction:
 
         I = np.eye(model.rank)
 
+        error_bound = self.error_bound(model, vf, **kwargs)
+        kwargs = self.purge_kwargs(**kwargs)
+
         alphas = vf.alphas
 
         S: List[Alpha] = []
@@ -101,4 +114,4 @@ class VI_IncPruning(VI_Algo):
 
         self.logger.debug('purging S')
         alphas = purge(S, I, key=lambda alpha: alpha.vector, **kwargs)
-        return ValueFunction(alphas, vf.horizon + 1)
+        return ValueFunction(alphas, vf.horizon + 1, error_bound)
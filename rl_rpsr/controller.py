@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from rl_rpsr.policy import Policy
+from rl_rpsr.value_function import ValueFunction
+
+__all__ = ['FiniteStateController', 'ControllerPolicy']
+
+
+class FiniteStateController:
+    """Policy graph whose nodes are alpha vectors of a value function.
+
+    Node `n` takes action `actions[n]`, and moves to node `successors[n, o]`
+    after observation `o`;  `alphas[n]` is the index of its alpha vector.
+    `agreement[n, o]` is the probability-weighted fraction of the successor
+    states whose maximal alpha is that of the successor node, i.e. where the
+    controller agrees with the value function policy, and is NaN if `o` was
+    never observed from node `n`.
+    """
+
+    def __init__(
+        self,
+        alphas: np.ndarray,
+        actions: np.ndarray,
+        successors: np.ndarray,
+        agreement: np.ndarray,
+    ):
+        self.alphas = alphas
+        self.actions = actions
+        self.successors = successors
+        self.agreement = agreement
+
+        # the start node is always the first
+        self.start = 0
+
+    def __len__(self):
+        return len(self.actions)
+
+    @classmethod
+    def extract(
+        cls,
+        model,
+        vf: ValueFunction,
+        points: Optional[np.ndarray] = None,
+        max_states: int = 256,
+    ) -> FiniteStateController:
+        """Extract the controller reachable from the start state of `model`.
+
+        Each node keeps up to `max_states` states in which its alpha vector is
+        maximal, starting from the model start state and the optional (K,
+        rank) `points`, e.g. from `sample_reachable`.  The states are
+        propagated through each observation of the node action, and the
+        successor is the alpha vector which is maximal in most of them,
+        weighted by the observation probabilities.  Nodes are expanded in
+        breadth-first order, each once.
+        """
+        logger = logging.getLogger(__name__)
+
+        if max_states < 1:
+            raise ValueError(f'invalid maximum number of states {max_states}')
+
+        num_observations = model.observation_space.n
+
+        def maximal(states: np.ndarray) -> np.ndarray:
+            return (states @ vf.matrix).argmax(1)
+
+        pools: Dict[int, List[np.ndarray]] = {}
+        sizes: Dict[int, int] = {}
+        expanded: Set[int] = set()
+
+        def pool(states: np.ndarray, indices: np.ndarray):
+            for i in np.unique(indices).tolist():
+                if i in expanded or sizes.get(i, 0) >= max_states:
+                    continue
+
+                block = states[indices == i][: max_states - sizes.get(i, 0)]
+                pools.setdefault(i, []).append(block)
+                sizes[i] = sizes.get(i, 0) + len(block)
+
+        start = np.asarray(model.start)[None]
+        root = int(maximal(start)[0])
+        pool(start, np.array([root]))
+        if points is not None:
+            pool(points, maximal(points))
+
+        nodes = {root: 0}
+        queue = deque([root])
+        rows: List[Tuple[List[int], List[float]]] = []
+        while queue:
+            i = queue.popleft()
+            expanded.add(i)
+            states = np.concatenate(pools.pop(i))
+
+            actions = np.full(len(states), vf.alphas[i].action)
+            probs = model.observation_probs_batch(states, actions)
+
+            successors = []
+            agreement = []
+            for o in range(num_observations):
+                (valid,) = np.nonzero(probs[:, o] > 0.0)
+                if valid.size == 0:
+                    # unobserved, the successor is never used
+                    successors.append(i)
+                    agreement.append(np.nan)
+                    continue
+
+                next_states = model.dynamics_batch(
+                    states[valid],
+                    actions[valid],
+                    np.full(valid.size, o),
+                )
+                indices = maximal(next_states)
+                pool(next_states, indices)
+
+                votes = np.bincount(indices, weights=probs[valid, o])
+                j = int(votes.argmax())
+                successors.append(j)
+                agreement.append(votes[j] / votes.sum())
+
+                if j not in nodes:
+                    nodes[j] = len(nodes)
+                    queue.append(j)
+
+            rows.append((successors, agreement))
+
+        alphas = np.array(list(nodes))
+        controller = cls(
+            alphas,
+            np.array([vf.alphas[i].action for i in alphas]),
+            np.array(
+                [[nodes[j] for j in successors] for successors, _ in rows]
+            ),
+            np.array([agreement for _, agreement in rows]),
+        )
+
+        logger.info(
+            'extracted controller with %d nodes from %d alphas',
+            len(controller),
+            len(vf),
+        )
+        for node, observation, agreement in controller.disagreements():
+            logger.info(
+                'node %d observation %d agreement %f',
+                node,
+                observation,
+                agreement,
+            )
+
+        return controller
+
+    def disagreements(self, tol: float = 0.0) -> List[Tuple[int, int, float]]:
+        """Return the transitions where the value function policy disagrees.
+
+        The (node, observation, agreement) triples with agreement below `1 -
+        tol` are sorted from the least agreeing.
+        """
+        nodes, observations = np.nonzero(self.agreement < 1.0 - tol)
+        ret = [
+            (int(n), int(o), float(self.agreement[n, o]))
+            for n, o in zip(nodes, observations)
+        ]
+        return sorted(ret, key=lambda x: x[2])
+
+    def evaluate(self, model, horizon: Optional[int] = None) -> float:
+        """Expected discounted return of the controller from `model.start`.
+
+        See `values`;  `horizon` is the number of rewards, or None for the
+        infinite-horizon return.
+        """
+        W = self.values(model, horizon)
+        return float(model.start @ W[self.start])
+
+    def values(self, model, horizon: Optional[int] = None) -> np.ndarray:
+        """Return the (|nodes|, rank) weights of the node values.
+
+        The value of node `n` is linear in the state, with weights `w_n = R_a
+        + discount \\sum_o M_{ao} w_{n'}`, where `a` is the node action and
+        `n'` its successor after `o`;  hence, the infinite-horizon weights
+        solve one sparse linear system over (node, state) pairs, while the
+        finite-horizon weights are `horizon` sparse backups.
+        """
+        from scipy.sparse import csr_matrix, identity
+        from scipy.sparse.linalg import spsolve
+
+        if horizon is not None and horizon < 0:
+            raise ValueError(f'invalid horizon {horizon}')
+
+        num_nodes = len(self)
+        rank = model.rank
+        size = num_nodes * rank
+
+        # (|nodes|, |O|, rank, rank) blocks, block (n, o) in block-row n and
+        # block-column `successors[n, o]`, summed over the observations
+        M = model.transitions[self.actions]
+        index = np.arange(rank)
+        rows = np.arange(num_nodes)[:, None, None, None] * rank + index[:, None]
+        cols = self.successors[:, :, None, None] * rank + index
+        B = csr_matrix(
+            (
+                M.ravel(),
+                (
+                    np.broadcast_to(rows, M.shape).ravel(),
+                    np.broadcast_to(cols, M.shape).ravel(),
+                ),
+            ),
+            shape=(size, size),
+        )
+        R = model.R[:, self.actions].T.ravel()
+
+        if horizon is None:
+            A = identity(size, format='csc') - model.discount * B.tocsc()
+            w = spsolve(A, R)
+        else:
+            w = np.zeros(size)
+            for _ in range(horizon):
+                w = R + model.discount * (B @ w)
+
+        return w.reshape(num_nodes, rank)
+
+
+class ControllerPolicy(Policy):
+    """Runs a `FiniteStateController` by table lookup."""
+
+    def __init__(self, controller: FiniteStateController):
+        super().__init__()
+        self.controller = controller
+
+        # python lists index faster than arrays, one lookup per step
+        self._actions = controller.actions.tolist()
+        self._successors = controller.successors.tolist()
+
+        self.node = controller.start
+
+    def reset(self) -> int:
+        self.node = self.controller.start
+        return self._actions[self.node]
+
+    def step(self, action: int, observation: int) -> int:
+        self.node = self._successors[self.node][observation]
+        return self._actions[self.node]
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from copy import deepcopy
-from dataclasses import dataclass
-from typing import FrozenSet, Iterator, Tuple
+import weakref
+from dataclasses import FrozenInstanceError, dataclass
+from typing import Any, FrozenSet, Iterable, Iterator, Optional, Tuple
 
 import yaml
 
@@ -20,24 +20,91 @@ class Interaction(yaml.YAMLObject):
         return Test((self,))
 
 
-@dataclass(eq=True, frozen=True)
 class Test(yaml.YAMLObject):
+    """Sequence of interactions, as an interned linked list.
+
+    A test is its first interaction `head` followed by the test `tail`, so
+    `prepend` is O(1) and shares the tail.  Tests are interned, i.e. equal
+    tests are the same object, so equality is identity and the hash is
+    computed once.
+    """
+
     yaml_tag = u'!Test'
 
-    interactions: Tuple[Interaction, ...]
+    __slots__ = ('head', 'tail', '_length', '_hash', '__weakref__')
+
+    _interned: 'weakref.WeakValueDictionary[Tuple[Any, Any], Test]' = (
+        weakref.WeakValueDictionary()
+    )
+
+    head: Optional[Interaction]
+    tail: Optional[Test]
+
+    def __new__(cls, interactions: Iterable[Interaction] = ()):
+        test = cls.empty()
+        for interaction in reversed(tuple(interactions)):
+            test = test.prepend(interaction)
+        return test
+
+    @classmethod
+    def _intern(cls, head: Optional[Interaction], tail: Optional[Test]):
+        key = head, tail
+        try:
+            return cls._interned[key]
+        except KeyError:
+            pass
+
+        test = object.__new__(cls)
+        object.__setattr__(test, 'head', head)
+        object.__setattr__(test, 'tail', tail)
+        length = 0 if tail is None else len(tail) + 1
+        object.__setattr__(test, '_length', length)
+        object.__setattr__(test, '_hash', hash(key))
+        cls._interned[key] = test
+        return test
 
     @staticmethod
     def empty():
-        return Test(())
+        return Test._intern(None, None)
 
     def prepend(self, interaction) -> Test:
-        return Test((interaction,) + deepcopy(self.interactions))
+        return Test._intern(interaction, self)
+
+    @property
+    def interactions(self) -> Tuple[Interaction, ...]:
+        return tuple(self)
 
     def __len__(self):
-        return len(self.interactions)
+        return self._length
 
     def __iter__(self) -> Iterator[Interaction]:
-        yield from self.interactions
+        test = self
+        while test.tail is not None:
+            yield test.head
+            test = test.tail
+
+    def __hash__(self):
+        return self._hash
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f'cannot assign to field {name!r}')
+
+    def __reduce__(self):
+        return Test, (self.interactions,)
+
+    def __repr__(self):
+        return f'Test(interactions={self.interactions!r})'
+
+    @classmethod
+    def to_yaml(cls, dumper, data):
+        return dumper.represent_mapping(
+            cls.yaml_tag, {'interactions': data.interactions}
+        )
+
+    @classmethod
+    def from_yaml(cls, loader, node):
+        mapping = loader.construct_mapping(node, deep=True)
+        return cls(mapping['interactions'])
 
 
 @dataclass(eq=True, frozen=True)
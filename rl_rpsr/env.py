@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import logging
+from typing import Optional
+
+import gym
+import numpy as np
+from gym.utils import seeding
+from rl_rpsr.util import sample_inverse_cdf
+
+__all__ = ['ModelEnv', 'check_period', 'stabilize']
+
+
+def check_period(name: str, period: Optional[int]):
+    if period is not None and period < 1:
+        raise ValueError(f'invalid {name} period {period}')
+
+
+def stabilize(
+    model,
+    state,
+    num_steps: int,
+    projection_period: Optional[int] = None,
+    normalization_period: Optional[int] = None,
+):
+    """Project and/or normalize `state` after `num_steps` steps, if due."""
+    if projection_period is not None and num_steps % projection_period == 0:
+        state = model.project(state)
+
+    if (
+        normalization_period is not None
+        and num_steps % normalization_period == 0
+    ):
+        state = model.normalize(state)
+
+    return state
+
+
+class ModelEnv(gym.Env):  # pylint: disable=abstract-method
+    """Environment which propagates the states of a BSR, PSR or RPSR model."""
+
+    def __init__(
+        self,
+        model,
+        seed=None,
+        projection_period: Optional[int] = None,
+        normalization_period: Optional[int] = None,
+    ):
+        """If `projection_period` is given, observation probabilities are
+        clamped and normalized at each step, and the state is projected back
+        onto the valid states every `projection_period` steps.
+
+        If `normalization_period` is given, the state is renormalized in
+        float64 every `normalization_period` steps, which bounds the drift of
+        reduced precision models, see `astype`."""
+        super().__init__()
+        self.seed(seed)
+
+        self.model = model
+        self.discount = model.discount
+        self.action_space = model.action_space
+        self.observation_space = model.observation_space
+        self.reward_range = model.reward_range
+
+        check_period('projection', projection_period)
+        self.projection_period = projection_period
+
+        check_period('normalization', normalization_period)
+        self.normalization_period = normalization_period
+
+        self.state = None
+        self.num_steps = 0
+
+    def seed(self, seed):  # pylint: disable=signature-differs
+        self.np_random, seed_ = seeding.np_random(seed)
+        return [seed_]
+
+    def reset(self):  # pylint: disable=arguments-differ
+        self.state = self.model.start.copy()
+        self.num_steps = 0
+        return self.state
+
+    def step(self, action):
+        reward = self.model.expected_reward(self.state, action)
+
+        # reduced precision probabilities are sampled in float64
+        p = self.model.observation_probs(self.state, action)
+        p = p.astype(np.float64, copy=False)
+
+        if self.projection_period is not None:
+            p = np.clip(p, 0.0, None)
+        elif (p < 0.0).any():
+            logger = logging.getLogger(__name__)
+            logger.warning('Negative probabilities, p=%s.  Clipping at 0.0', p)
+            p = np.clip(p, 0.0, None)
+
+        # one uniform per step, see `sample_inverse_cdf`
+        observation = sample_inverse_cdf(p, self.np_random.random())
+
+        self.state = self.model.dynamics(self.state, action, observation)
+        self.num_steps += 1
+        self.state = stabilize(
+            self.model,
+            self.state,
+            self.num_steps,
+            self.projection_period,
+            self.normalization_period,
+        )
+
+        done = False
+        info = {'observation': observation}
+
+        return self.state, reward, done, info
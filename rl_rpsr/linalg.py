@@ -1,19 +1,70 @@
 import itertools as itt
 import logging
-from typing import Iterable, List
+from typing import Iterable, List, Tuple
 
 import numpy as np
 import numpy.linalg as la
-from scipy.spatial import distance_matrix
 
-__all__ = ['cross_sum', 'max_bigraph_distance', 'linearly_independent']
+__all__ = [
+    'cross_sum',
+    'grouped_vecmat',
+    'max_bigraph_distance',
+    'linearly_independent',
+    'simplex_lstsq',
+]
 
 
 def cross_sum(vectors_list: Iterable[List[np.ndarray]]) -> List[np.ndarray]:
     return [np.sum(vectors, axis=0) for vectors in itt.product(*vectors_list)]
 
 
+def grouped_vecmat(
+    vectors: np.ndarray, matrices: np.ndarray, *indices: np.ndarray
+) -> np.ndarray:
+    """Return the rows `vectors[k] @ matrices[indices[0][k], indices[1][k], ...]`.
+
+    Rows which select the same matrix are multiplied in a single product, so
+    that no (K, N, N) gather of the selected matrices is ever allocated.
+    """
+    shape = matrices.shape[: len(indices)]
+    keys = np.ravel_multi_index(indices, shape)
+
+    result = np.empty(
+        (vectors.shape[0], matrices.shape[-1]),
+        dtype=np.result_type(vectors, matrices),
+    )
+
+    order = np.argsort(keys, kind='stable')
+    unique_keys, starts = np.unique(keys[order], return_index=True)
+    for key, rows in zip(unique_keys, np.split(order, starts[1:])):
+        result[rows] = vectors[rows] @ matrices[np.unravel_index(key, shape)]
+
+    return result
+
+
+def simplex_lstsq(
+    matrix: np.ndarray, vector: np.ndarray, weight: float = 1e3
+) -> Tuple[np.ndarray, float]:
+    """Return the distribution `x` which minimizes `|x @ matrix - vector|`.
+
+    The simplex constraint `sum(x) = 1` is enforced as a row of the
+    nonnegative least squares problem, scaled by `weight`, and `x` is then
+    normalized;  the residual is that of the normalized `x`.
+    """
+    from scipy.optimize import nnls
+
+    scale = weight * max(1.0, np.abs(matrix).max())
+    A = np.vstack([matrix.T, np.full(matrix.shape[0], scale)])
+    b = np.append(vector, scale)
+
+    x, _ = nnls(A, b)
+    x /= x.sum()
+    return x, float(la.norm(x @ matrix - vector))
+
+
 def max_bigraph_distance(x: np.ndarray, y: np.ndarray):
+    from scipy.spatial import distance_matrix
+
     logger = logging.getLogger(__name__)
 
     if x.ndim != 2:
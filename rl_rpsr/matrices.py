@@ -1,21 +1,94 @@
-from functools import lru_cache
+import functools
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Tuple
 
 import numpy as np
 
+__all__ = ['R', 'G', 'D', 'env_cache']
 
-@lru_cache(maxsize=None)
+
+class _EnvCache:
+    """Bounded LRU cache of per-environment values.
+
+    Environments are referenced weakly, so a cached value never keeps its
+    environment alive;  entries are dropped as soon as the environment is
+    garbage collected, or when the cache grows beyond `maxsize` entries.
+    """
+
+    def __init__(self, function: Callable[[Any], Any], maxsize: int):
+        if maxsize < 1:
+            raise ValueError(f'invalid maxsize {maxsize}')
+
+        self.function = function
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[int, Tuple[weakref.ref, Any]]' = (
+            OrderedDict()
+        )
+        functools.update_wrapper(self, function)
+
+    def __call__(self, env):
+        key = id(env)
+
+        try:
+            ref, value = self._entries[key]
+        except KeyError:
+            pass
+        else:
+            if ref() is env:
+                self._entries.move_to_end(key)
+                return value
+
+        value = self.function(env)
+
+        ref = weakref.ref(env, functools.partial(self._finalize, key))
+        self._entries[key] = ref, value
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+        return value
+
+    def _finalize(self, key: int, ref: weakref.ref):
+        # the id of a collected env may already have been reused
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is ref:
+            del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def cache_discard(self, env):
+        """Drop the cached value of `env`, if any."""
+        entry = self._entries.get(id(env))
+        if entry is not None and entry[0]() is env:
+            del self._entries[id(env)]
+
+    def cache_clear(self):
+        self._entries.clear()
+
+
+def env_cache(maxsize: int = 8) -> Callable[[Callable], _EnvCache]:
+    """Decorator which caches a function of an environment in an `_EnvCache`."""
+
+    def decorator(function: Callable) -> _EnvCache:
+        return _EnvCache(function, maxsize)
+
+    return decorator
+
+
+@env_cache()
 def R(env):
     """Return the expected rewards matrix R_{ij} = \\mathbb{E}\\left[ r \\mid s=i, a=j \\right]."""
     return np.einsum('sat,sato,sato->sa', env.T, env.O, env.R)
 
 
-@lru_cache(maxsize=None)
+@env_cache()
 def G(env):
     """Return the generative matrix G_{ij} = \\Pr(s'=i, o \\mid s=j, a)."""
     return np.einsum('sat,sato->aots', env.T, env.O)
 
 
-@lru_cache(maxsize=None)
+@env_cache()
 def D(env):
     """Return the dynamics matrix D_{ij} = \\Pr(s'=i \\mid s=j, a, o)."""
     G_ = G(env)
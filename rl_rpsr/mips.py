@@ -0,0 +1,119 @@
+from typing import List, Tuple
+
+import numpy as np
+
+__all__ = ['MIPS_Index']
+
+
+class MIPS_Index:
+    """Exact maximum inner product search over the columns of `matrix`.
+
+    The columns are split recursively at the median of their coordinate of
+    largest spread, into leaves of at most `leaf_size` columns, each with a
+    bounding box `[lo, hi]`;  hence, the inner products of a leaf with `x` are
+    bounded by `hi @ max(x, 0) + lo @ min(x, 0)`.  A search evaluates the leaf
+    with the largest bound, and then only the leaves whose bound reaches that
+    value, minus a margin which covers the rounding errors.  If more than
+    `max_fraction` of the leaves remain, pruning would not pay off and the
+    search falls back to `argmax(matrix.T @ x)`.
+
+    The leaves are stored as contiguous blocks of rows, padded with copies of
+    their first column, so that the remaining leaves are evaluated by a single
+    matrix-vector product.  That product may round differently from
+    `matrix.T @ x`, hence the index found is that of `argmax(matrix.T @ x)`
+    only if no other column is within the margin of the maximum;  otherwise,
+    the near ties are settled by `argmax(matrix.T @ x)` itself, so that the
+    index is always that of brute force, ties included.  The value found may
+    differ from `max(matrix.T @ x)` by rounding errors.
+    """
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        leaf_size: int = 64,
+        max_fraction: float = 0.25,
+    ):
+        if leaf_size < 1:
+            raise ValueError(f'invalid leaf size {leaf_size}')
+
+        if not 0.0 <= max_fraction <= 1.0:
+            raise ValueError(f'invalid maximum fraction {max_fraction}')
+
+        matrix = np.asarray(matrix)
+        if matrix.ndim != 2 or matrix.shape[1] == 0:
+            raise ValueError(f'invalid matrix shape {matrix.shape}')
+
+        self.matrix = matrix
+        self.leaf_size = leaf_size
+        self.max_fraction = max_fraction
+
+        leaves = _split(matrix, leaf_size)
+        width = max(leaf.size for leaf in leaves)
+
+        # (|leaves|, width) column indices, and (|leaves|, width, |S|) rows
+        self.columns = np.stack(
+            [np.pad(leaf, (0, width - leaf.size), 'edge') for leaf in leaves]
+        )
+        self.rows = np.ascontiguousarray(matrix.T[self.columns])
+
+        # (|leaves|, |S|) bounding boxes
+        self.lo = self.rows.min(1)
+        self.hi = self.rows.max(1)
+
+        # twice the difference between two roundings of a dot product, or of a
+        # bound, relative to |a| @ |x|
+        eps = np.finfo(np.result_type(matrix, np.float32)).eps
+        self._tol = 4.0 * (matrix.shape[0] + 2) * eps
+        self._scale = np.abs(matrix).max(1)
+
+    def __len__(self):
+        return self.matrix.shape[1]
+
+    def search(self, x: np.ndarray) -> Tuple[int, float]:
+        """Return the index and value of the maximum inner product with `x`."""
+        num_leaves, width, dim = self.rows.shape
+
+        bounds = self.hi @ np.maximum(x, 0.0) + self.lo @ np.minimum(x, 0.0)
+        margin = self._tol * (self._scale @ np.abs(x))
+        value = (self.rows[bounds.argmax()] @ x).max()
+
+        (leaves,) = np.nonzero(bounds >= value - margin)
+        if leaves.size <= self.max_fraction * num_leaves:
+            values = self.rows[leaves].reshape(-1, dim) @ x
+            columns = self.columns[leaves].ravel()
+
+            # a single column within the margin is the maximum of any rounding
+            candidates = columns[values >= values.max() - margin]
+            if (candidates == candidates[0]).all():
+                i = values.argmax()
+                return int(columns[i]), values[i]
+
+        # too many leaves to prune, or near ties
+        values = self.matrix.T @ x
+        i = values.argmax()
+        return int(i), values[i]
+
+
+def _split(matrix: np.ndarray, leaf_size: int) -> List[np.ndarray]:
+    leaves = []
+    stack = [np.arange(matrix.shape[1])]
+    while stack:
+        indices = stack.pop()
+        if indices.size <= leaf_size:
+            leaves.append(indices)
+            continue
+
+        block = matrix[:, indices]
+        spread = block.max(1) - block.min(1)
+        dim = spread.argmax()
+        if spread[dim] == 0.0:
+            # identical columns can not be split
+            leaves.append(indices)
+            continue
+
+        order = np.argsort(block[dim], kind='stable')
+        half = indices.size // 2
+        stack.append(indices[order[half:]])
+        stack.append(indices[order[:half]])
+
+    return leaves
@@ -0,0 +1,120 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from typing import Optional, Union
+
+import numpy as np
+from rl_rpsr.core import Intent, Intents, Test, Tests
+from rl_rpsr.pomdp import POMDP_Model
+
+__all__ = [
+    'ModelCache',
+    'make_model',
+    'pomdp_hash',
+    'core_hash',
+    'FORMAT_VERSION',
+]
+
+# version of the stored arrays, to be increased whenever the `ARRAYS` of a
+# model, or the way they are computed, change;  older entries are then ignored
+FORMAT_VERSION = 1
+
+
+def _update_array(h, array):
+    array = np.ascontiguousarray(array)
+    h.update(f'{array.dtype.str}{array.shape}'.encode())
+    h.update(array.tobytes())
+
+
+def pomdp_hash(pomdp_model: POMDP_Model) -> str:
+    """sha256 of the POMDP content, i.e. its start, dynamics and rewards."""
+    env = pomdp_model.env
+
+    h = hashlib.sha256()
+    h.update(repr(pomdp_model.discount).encode())
+    for array in [env.start, env.T, env.O, env.R]:
+        _update_array(h, array)
+
+    return h.hexdigest()
+
+
+def _test_key(test: Test):
+    return tuple((i.action, i.observation) for i in test)
+
+
+def core_hash(core: Union[Tests, Intents]) -> str:
+    """sha256 of the ordered tests or intents of a core."""
+    keys = [
+        (_test_key(x.test), x.action) if isinstance(x, Intent) else _test_key(x)
+        for x in core
+    ]
+    return hashlib.sha256(repr(keys).encode()).hexdigest()
+
+
+class ModelCache:
+    """On-disk cache of the arrays of PSR and RPSR models.
+
+    Models are stored as `.npy` files under a key made of the
+    `FORMAT_VERSION`, the POMDP content hash and the core hash, and loaded
+    back memory-mapped, so that the (expensive) construction of a model
+    happens only once across runs and processes.  The model class must
+    define `ARRAYS` and `from_arrays`.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, cls, pomdp_model: POMDP_Model, core) -> str:
+        return os.path.join(
+            self.directory,
+            f'v{FORMAT_VERSION}',
+            pomdp_hash(pomdp_model),
+            f'{cls.__name__}-{core_hash(core)}',
+        )
+
+    def load(self, cls, pomdp_model: POMDP_Model, core):
+        """Load the `cls` model of `core`, building and storing it if needed."""
+        logger = logging.getLogger(__name__)
+
+        path = self.path(cls, pomdp_model, core)
+        if os.path.isdir(path):
+            logger.info('loading %s from cache %s', cls.__name__, path)
+            arrays = {
+                name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+                for name in cls.ARRAYS
+            }
+            return cls.from_arrays(pomdp_model, arrays)
+
+        logger.info('building %s for cache %s', cls.__name__, path)
+        model = cls(pomdp_model, core)
+        self._store(path, {name: getattr(model, name) for name in cls.ARRAYS})
+        return model
+
+    @staticmethod
+    def _store(path: str, arrays):
+        # arrays are written to a temporary directory which is then renamed,
+        # so that concurrent processes never see a partial entry
+        parent = os.path.dirname(path)
+        os.makedirs(parent, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=parent)
+        try:
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp_path, f'{name}.npy'), array)
+
+            os.rename(tmp_path, path)
+        except OSError:
+            # another process stored the same entry first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            if not os.path.isdir(path):
+                raise
+
+
+def make_model(cls, pomdp_model: POMDP_Model, core, cache: Optional[str]):
+    """Make the `cls` model of `core`, through the cache directory if any."""
+    if cache is None:
+        return cls(pomdp_model, core)
+
+    return ModelCache(cache).load(cls, pomdp_model, core)
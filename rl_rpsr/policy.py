@@ -1,6 +1,10 @@
 from __future__ import annotations
 
 import abc
+from typing import Optional
+
+import numpy as np
+from rl_rpsr.env import check_period, stabilize
 
 
 class Policy(metaclass=abc.ABCMeta):
@@ -12,14 +16,23 @@ class Policy(metaclass=abc.ABCMeta):
     def step(self, action: int, observation: int) -> int:
         raise NotImplementedError
 
+    def seed(  # pylint: disable=no-self-use,unused-argument
+        self, seed: Optional[int] = None
+    ):
+        """Seed the random stream of a stochastic policy."""
+
 
 class RandomPolicy(Policy):
-    def __init__(self, model):
+    def __init__(self, model, seed: Optional[int] = None):
         super().__init__()
         self.model = model
+        self.seed(seed)
+
+    def seed(self, seed: Optional[int] = None):
+        self.rng = np.random.default_rng(seed)
 
     def _action(self) -> int:
-        return self.model.action_space.sample()
+        return int(self.rng.integers(self.model.action_space.n))
 
     def reset(self) -> int:
         return self._action()
@@ -29,20 +42,86 @@ class RandomPolicy(Policy):
 
 
 class ModelPolicy(Policy):
-    def __init__(self, model, vf):
+    def __init__(
+        self,
+        model,
+        vf,
+        projection_period: Optional[int] = None,
+        normalization_period: Optional[int] = None,
+    ):
         super().__init__()
         self.model = model
         self.vf = vf
 
+        # see the `projection_period` and `normalization_period` of `ModelEnv`
+        check_period('projection', projection_period)
+        self.projection_period = projection_period
+
+        check_period('normalization', normalization_period)
+        self.normalization_period = normalization_period
+
         self.state = None
+        self.num_steps = 0
 
     def _action(self) -> int:
         return self.vf.policy(self.state)
 
     def reset(self) -> int:
         self.state = self.model.start.copy()
+        self.num_steps = 0
         return self._action()
 
     def step(self, action: int, observation: int) -> int:
         self.state = self.model.dynamics(self.state, action, observation)
+        self.num_steps += 1
+        self.state = stabilize(
+            self.model,
+            self.state,
+            self.num_steps,
+            self.projection_period,
+            self.normalization_period,
+        )
+
         return self._action()
+
+
+class CheckedPolicy(Policy):
+    """Follows `policy`, and counts the steps in which `reference` agrees.
+
+    Both policies see the same history, e.g. to check that a reduced precision
+    policy picks the same actions as its float64 `reference`.
+    """
+
+    def __init__(self, policy: Policy, reference: Policy):
+        super().__init__()
+        self.policy = policy
+        self.reference = reference
+
+        self.num_steps = 0
+        self.num_agreements = 0
+
+    def _check(self, action: int, action_reference: int) -> int:
+        self.num_steps += 1
+        self.num_agreements += int(action == action_reference)
+        return action
+
+    @property
+    def agreement(self) -> float:
+        """Fraction of the steps in which the two policies agree."""
+        if self.num_steps == 0:
+            return float('nan')
+
+        return self.num_agreements / self.num_steps
+
+    def seed(self, seed: Optional[int] = None):
+        self.policy.seed(seed)
+        self.reference.seed(seed)
+
+    def reset(self) -> int:
+        return self._check(self.policy.reset(), self.reference.reset())
+
+    def step(self, action: int, observation: int) -> int:
+        return self._check(
+            self.policy.step(action, observation),
+            self.reference.step(action, observation),
+        )
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import logging
+from typing import TYPE_CHECKING
 
 import gym
-from gym_pomdps import POMDP
 from rl_rpsr import matrices
 
+if TYPE_CHECKING:
+    from gym_pomdps import POMDP
+
 __all__ = ['POMDP_Model']
 
 
@@ -14,9 +17,11 @@ class POMDP_Model:
         self.env = env
         self.T = env.T
         self.O = env.O
-        self.R = matrices.R(env)
-        self.G = matrices.G(env)
-        self.D = matrices.D(env)
+
+        # dense tensors are computed on first access, see `release`
+        self._R = None
+        self._G = None
+        self._D = None
 
         self.discount = env.model.discount
         self.states = env.model.states
@@ -29,8 +34,48 @@ class POMDP_Model:
         self.observation_space = env.observation_space
         self.reward_range = env.reward_range
 
+    @property
+    def R(self):
+        """(|S|, |A|) expected rewards matrix."""
+        if self._R is None:
+            self._R = matrices.R(self.env)
+        return self._R
+
+    @property
+    def G(self):
+        """(|A|, |O|, |S|, |S|) generative matrix."""
+        if self._G is None:
+            self._G = matrices.G(self.env)
+        return self._G
+
+    @property
+    def D(self):
+        """(|A|, |O|, |S|, |S|) dynamics matrix."""
+        if self._D is None:
+            self._D = matrices.D(self.env)
+        return self._D
+
+    def release(self, *names: str):
+        """Release the dense tensors `names` (default all of R, G, D).
+
+        The tensors are dropped both from this model and from the module-level
+        cache in `matrices`, and are recomputed if accessed again.  Objects
+        which hold their own references (e.g. `BSR_Model.G`) keep them alive.
+        """
+        if not names:
+            names = ('R', 'G', 'D')
+
+        for name in names:
+            if name not in ('R', 'G', 'D'):
+                raise ValueError(f'invalid tensor name `{name}`')
+
+            setattr(self, f'_{name}', None)
+            getattr(matrices, name).cache_discard(self.env)
+
     @staticmethod
     def make(name) -> POMDP_Model:
+        from gym_pomdps import POMDP
+
         logger = logging.getLogger(__name__)
         logger.info('making %s', name)
 
@@ -1,17 +1,14 @@
+import contextlib
 import logging
-from typing import Any, Callable, List, Optional, TypeVar
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Set, TypeVar
 
-import cvxpy as cp
 import numpy as np
 from rl_rpsr.linalg import cross_sum
-from scipy.optimize import linprog
-
-try:
-    from cylp.cy import CyClpSimplex
-    from cylp.py.modeling.CyLPModel import CyLPArray, CyLPModel
-except (ImportError, ModuleNotFoundError):
-    pass
-
+from rl_rpsr.shared import LazySharedArrays, SharedArrayRef, attach_refs
 
 ArrayKey = Callable[[Any], np.ndarray]
 
@@ -19,29 +16,577 @@ ArrayKey = Callable[[Any], np.ndarray]
 T = TypeVar('T', Any, np.ndarray)
 
 
+# relative tolerance for a vector to be the strict maximizer at a point
+_SCREEN_TOL = 1e-10
+
+# relative tolerance of the geometric computations
+_GEOMETRIC_TOL = 1e-12
+
+PURGE_BACKENDS = ['auto', 'lp', 'geometric']
+
+
+@dataclass
+class PurgeStats:
+    """Counts of the vectors handled by each stage of `purge`.
+
+    The counts accumulate over all the purges given the same instance.
+    """
+
+    num_purges: int = 0
+    num_input: int = 0
+    num_duplicates: int = 0
+    num_dominated: int = 0
+    num_screened: int = 0
+    num_rejected: int = 0
+    num_bounded: int = 0
+    num_lps: int = 0
+    num_output: int = 0
+
+    def update(self, other: 'PurgeStats'):
+        for field in fields(self):
+            value = getattr(self, field.name) + getattr(other, field.name)
+            setattr(self, field.name, value)
+
+
 def purge(
-    objects: List[T], U, *args, key: Optional[ArrayKey] = None, **kwargs
+    objects: List[T],
+    U,
+    *args,
+    key: Optional[ArrayKey] = None,
+    points: Optional[np.ndarray] = None,
+    num_samples: int = 100,
+    witnesses: Optional['WitnessStore'] = None,
+    dedup_tol: float = 0.0,
+    stats: Optional[PurgeStats] = None,
+    backend: str = 'auto',
+    max_geometric_rank: int = 5,
+    executor: Optional[Executor] = None,
+    batch_size: int = 8,
+    shard_size: Optional[int] = None,
+    **kwargs,
 ) -> List[T]:
 
     logger = logging.getLogger(__name__)
     logger.debug('purging %d vectors', len(objects))
 
-    objects_old, objects = objects, dominationCheck(objects, U, key=key)
+    if stats is None:
+        stats = PurgeStats()
+
+    if shard_size is not None and len(objects) > shard_size:
+        vectors = objects if key is None else list(map(key, objects))
+        indices = _sharded_purge_indices(
+            np.row_stack(vectors),
+            U,
+            *args,
+            shard_size=shard_size,
+            executor=executor,
+            points=points,
+            num_samples=num_samples,
+            witnesses=witnesses,
+            dedup_tol=dedup_tol,
+            stats=stats,
+            backend=backend,
+            max_geometric_rank=max_geometric_rank,
+            batch_size=batch_size,
+            **kwargs,
+        )
+        return [objects[i] for i in indices]
+
+    objects_old, objects = objects, deduplicate(
+        objects, U, key=key, tol=dedup_tol
+    )
+    logger.debug('purging %d vectors (duplicates removed)', len(objects))
+
+    objects_unique, objects = objects, dominationCheck(objects, U, key=key)
     logger.debug('purging %d vectors (dominated removed)', len(objects))
 
     vectors = objects if key is None else list(map(key, objects))
-    indices = _purge_indices(vectors, U, *args, **kwargs)
+    indices = _purge_indices(
+        vectors,
+        U,
+        *args,
+        points=points,
+        num_samples=num_samples,
+        witnesses=witnesses,
+        stats=stats,
+        backend=backend,
+        max_geometric_rank=max_geometric_rank,
+        executor=executor,
+        batch_size=batch_size,
+        **kwargs,
+    )
     objects_new = [objects[i] for i in indices]
 
+    stats.num_purges += 1
+    stats.num_input += len(objects_old)
+    stats.num_duplicates += len(objects_old) - len(objects_unique)
+    stats.num_dominated += len(objects_unique) - len(objects)
+    stats.num_output += len(objects_new)
+
     logger.debug(
-        'purging result %d -> %d -> %d',
+        'purging result %d -> %d -> %d -> %d',
         len(objects_old),
+        len(objects_unique),
         len(objects),
         len(objects_new),
     )
     return objects_new
 
 
+def _purge_shard(vectors: np.ndarray, U, args, kwargs):
+    """Purge a shard of `vectors`, returning the kept indices and stats."""
+    stats = PurgeStats()
+    indices = purge(
+        list(range(vectors.shape[0])),
+        U,
+        *args,
+        key=vectors.__getitem__,
+        stats=stats,
+        **kwargs,
+    )
+    return np.sort(indices), stats
+
+
+def _purge_shared_shard(
+    refs: Dict[str, SharedArrayRef], shard: np.ndarray, args, kwargs
+):
+    arrays = attach_refs(refs)
+    return _purge_shard(arrays['vectors'][shard], arrays['U'], args, kwargs)
+
+
+def _share(executor: Optional[Executor], **arrays):
+    """Share `arrays` with the workers of a process pool, if any.
+
+    Tasks then send the references of the arrays, instead of pickling them;
+    the arrays are only published once the first task needs them, and `U` is
+    not published again if it is already shared, see `attach_model`.
+    """
+    if not isinstance(executor, ProcessPoolExecutor):
+        return contextlib.nullcontext()
+
+    return LazySharedArrays(arrays)
+
+
+def _sharded_purge_indices(
+    vectors: np.ndarray,
+    U,
+    *args,
+    shard_size: int,
+    executor: Optional[Executor] = None,
+    witnesses: Optional['WitnessStore'] = None,
+    stats: Optional[PurgeStats] = None,
+    eps: float = 0.0,
+    dedup_tol: float = 0.0,
+    **kwargs,
+) -> np.ndarray:
+    """Purge `vectors` by shards of `shard_size`, merged pairwise in a tree.
+
+    The pruned envelope of a union is the pruned union of the pruned parts,
+    so each level only purges the survivors of the previous one.  The
+    approximation budgets `eps` and `dedup_tol` are split evenly among the
+    levels, so the total error stays within that of a single purge.  With an
+    `executor`, the purges of each level run in parallel, and the final one
+    solves its LPs in parallel.
+    """
+    if shard_size < 2:
+        raise ValueError(f'Invalid shard size {shard_size}')
+
+    logger = logging.getLogger(__name__)
+
+    num_vectors = vectors.shape[0]
+    shards = [
+        np.arange(i, min(i + shard_size, num_vectors))
+        for i in range(0, num_vectors, shard_size)
+    ]
+    num_levels = int(np.ceil(np.log2(len(shards)))) + 1
+    kwargs.update(eps=eps / num_levels, dedup_tol=dedup_tol / num_levels)
+
+    with _share(executor, vectors=vectors, U=U) as shared:
+        while True:
+            logger.debug(
+                'purging %d shards of %d vectors',
+                len(shards),
+                sum(shard.size for shard in shards),
+            )
+
+            if len(shards) == 1:
+                (shard,) = shards
+                kept, shard_stats = _purge_shard(
+                    vectors[shard],
+                    U,
+                    args,
+                    {'executor': executor, 'witnesses': witnesses, **kwargs},
+                )
+                results = [(kept, shard_stats)]
+
+            elif executor is None:
+                results = [
+                    _purge_shard(
+                        vectors[shard],
+                        U,
+                        args,
+                        {'witnesses': witnesses, **kwargs},
+                    )
+                    for shard in shards
+                ]
+
+            elif shared is None:
+                futures = [
+                    executor.submit(
+                        _purge_shard, vectors[shard], U, args, kwargs
+                    )
+                    for shard in shards
+                ]
+                results = [future.result() for future in futures]
+
+            else:
+                # the shards only send their indices to the process pool
+                futures = [
+                    executor.submit(
+                        _purge_shared_shard, shared.refs(), shard, args, kwargs
+                    )
+                    for shard in shards
+                ]
+                results = [future.result() for future in futures]
+
+            shards = [shard[kept] for shard, (kept, _) in zip(shards, results)]
+            if stats is not None:
+                for _, shard_stats in results:
+                    stats.update(shard_stats)
+
+            if len(shards) == 1:
+                return shards[0]
+
+            shards = [
+                np.concatenate(shards[i : i + 2])
+                for i in range(0, len(shards), 2)
+            ]
+
+
+def deduplicate(
+    objects: List[T], U, key: Optional[ArrayKey] = None, tol: float = 0.0
+) -> List[T]:
+    """Remove the duplicate vectors, keeping the first occurrence of each.
+
+    Vectors are compared through their values `vector @ U.T` at the simplex
+    corners, quantized to multiples of `tol` (exactly if `tol` is 0);  hence,
+    a removed vector is worth less than `tol` more than the kept one at any
+    state.
+    """
+    if tol < 0.0:
+        raise ValueError(f'Negative tolerance ({tol})')
+
+    if len(objects) < 2:
+        return objects
+
+    vectors = objects if key is None else list(map(key, objects))
+    values = np.row_stack(vectors) @ U.T
+    if tol > 0.0:
+        values = np.round(values / tol)
+    # adding 0.0 turns -0.0 into 0.0
+    values = np.ascontiguousarray(values + 0.0)
+
+    keys: Set[bytes] = set()
+    indices: List[int] = []
+    for i, row in enumerate(values):
+        row_key = row.tobytes()
+        if row_key not in keys:
+            keys.add(row_key)
+            indices.append(i)
+
+    if len(indices) == len(objects):
+        return objects
+
+    return [objects[i] for i in indices]
+
+
+class WitnessStore:
+    """Bounded store of the witness points found by the pruning LPs.
+
+    Points are deduplicated after rounding to `decimals` decimals.  A point is
+    evicted when it has not been a (strict) witness for more than `max_age`
+    calls to `step`, or as the least recently used one when the store holds
+    more than `maxsize` points.
+    """
+
+    def __init__(self, maxsize: int = 1_000, max_age: int = 2, decimals=9):
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self.decimals = decimals
+
+        self.epoch = 0
+        # maps point key to (point, epoch of last use)
+        self._points: 'OrderedDict[bytes, Any]' = OrderedDict()
+        self._keys: List[bytes] = []
+        self._array: Optional[np.ndarray] = None
+
+    def __len__(self):
+        return len(self._points)
+
+    def _key(self, x: np.ndarray) -> bytes:
+        return np.round(x, self.decimals).tobytes()
+
+    def add(self, x: np.ndarray):
+        key = self._key(x)
+        self._points[key] = x, self.epoch
+        self._points.move_to_end(key)
+        while len(self._points) > self.maxsize:
+            self._points.popitem(last=False)
+
+        self._array = None
+
+    def touch(self, indices):
+        """Mark the points at `indices` of `points` as used in this epoch."""
+        for i in indices:
+            key = self._keys[i]
+            if key in self._points:
+                self._points[key] = self._points[key][0], self.epoch
+                self._points.move_to_end(key)
+
+    def step(self):
+        """Advance the epoch (e.g. the VI horizon) and evict stale points."""
+        self.epoch += 1
+        stale = [
+            key
+            for key, (_, epoch) in self._points.items()
+            if self.epoch - epoch > self.max_age
+        ]
+        for key in stale:
+            del self._points[key]
+
+        self._array = None
+
+    def points(self, dim: int) -> Optional[np.ndarray]:
+        """(N, dim) array of the stored points, None if there are none."""
+        if self._array is None:
+            self._keys = list(self._points.keys())
+            self._array = (
+                np.stack([x for x, _ in self._points.values()])
+                if self._points
+                else np.empty((0, dim))
+            )
+
+        if self._array.shape[0] == 0 or self._array.shape[1] != dim:
+            return None
+
+        return self._array
+
+
+@lru_cache(maxsize=16)
+def _sample_beliefs(num_states: int, num_samples: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    beliefs = rng.dirichlet(np.ones(num_states), size=num_samples)
+    beliefs.setflags(write=False)
+    return beliefs
+
+
+def sample_points(
+    U, num_samples: int, points: Optional[np.ndarray] = None, seed: int = 0
+) -> np.ndarray:
+    """Return witness candidate points in the image of the belief simplex.
+
+    The points are the simplex corners and `num_samples` random beliefs, all
+    projected through `U`, followed by the given (already projected) `points`,
+    e.g. reachable states.  The random beliefs are cached across calls.
+    """
+    X = [U, _sample_beliefs(U.shape[0], num_samples, seed) @ U]
+    if points is not None:
+        X.append(np.atleast_2d(points))
+
+    return np.concatenate(X)
+
+
+def _strict_maximizers(alphas: np.ndarray, X: np.ndarray, eps=0.0):
+    """Index of the strict maximizer vector at each point, or -1 if none.
+
+    A vector which is the strict maximizer at some point improves the envelope
+    of all others by more than `eps`, so it is certainly kept by the exact
+    pruning.
+    """
+    if alphas.shape[0] < 2:
+        return np.zeros(X.shape[0], dtype=int)
+
+    values = alphas @ X.T
+    second, first = np.partition(values, -2, axis=0)[-2:]
+    tol = eps + _SCREEN_TOL * np.maximum(1.0, np.abs(first))
+    strict = first - second > tol
+
+    return np.where(strict, values.argmax(0), -1)
+
+
+def _screen_indices(alphas: np.ndarray, X: np.ndarray, eps=0.0) -> Set[int]:
+    """Indices of the vectors which are the strict maximizer at some point."""
+    maximizers = _strict_maximizers(alphas, X, eps)
+    return set(maximizers[maximizers >= 0].tolist())
+
+
+def _affine_coordinates(U):
+    """Affine coordinates `x = c + B y` of the simplex image spanned by `U`.
+
+    Returns the centroid `c` of the rows of `U` and the (N, k) orthonormal
+    basis `B` of their affine hull, where k is its dimension.
+    """
+    c = U.mean(0)
+    _, s, Vt = np.linalg.svd(U - c, full_matrices=False)
+    k = int((s > _GEOMETRIC_TOL * max(1.0, s[0])).sum())
+    return c, Vt[:k].T
+
+
+def _envelope_1d(g, h, lo, hi):
+    """Upper envelope of the lines `h + g y` over the interval [lo, hi].
+
+    Returns the indices of the lines which appear on the envelope with a
+    segment of positive length, and the midpoints of their segments.
+    """
+    # sort by slope, keeping the highest of the parallel lines
+    order = np.lexsort((h, g))
+    last = np.append(g[order][1:] != g[order][:-1], True)
+    order = order[last]
+
+    # upper hull of the dual points (g, h), in increasing slope
+    hull: List[int] = []
+    for i in order:
+        while len(hull) >= 2:
+            o, a = hull[-2], hull[-1]
+            cross = (g[a] - g[o]) * (h[i] - h[o]) - (h[a] - h[o]) * (
+                g[i] - g[o]
+            )
+            if cross < 0.0:
+                break
+            hull.pop()
+        hull.append(i)
+
+    hull_ = np.array(hull)
+    g_hull, h_hull = g[hull_], h[hull_]
+
+    # line j of the hull is maximal between the breakpoints y_{j-1} and y_j
+    breakpoints = (h_hull[:-1] - h_hull[1:]) / (g_hull[1:] - g_hull[:-1])
+    left = np.clip(np.concatenate([[lo], breakpoints]), lo, hi)
+    right = np.clip(np.concatenate([breakpoints, [hi]]), lo, hi)
+    on_envelope = right - left > _GEOMETRIC_TOL * max(1.0, hi - lo)
+
+    return hull_[on_envelope], (left + right)[on_envelope] / 2
+
+
+def _envelope_hull(lifted, Y):
+    """Upper hull of the `lifted` (g, h) points over the polytope conv(Y).
+
+    Returns the indices of the vertices of the upper facets, and for each the
+    centroid of the maximizing coordinates of its incident upper facets.
+    """
+    from scipy.spatial import ConvexHull
+
+    hull = ConvexHull(lifted)
+    normals = hull.equations[:, :-1]
+
+    # conservatively, vertical facets count as upper facets
+    upper = normals[:, -1] > -_GEOMETRIC_TOL
+    candidates = np.unique(hull.simplices[upper])
+
+    strict = normals[:, -1] > _GEOMETRIC_TOL
+    simplices = hull.simplices[strict]
+    # at the maximizing coordinates of a facet, all its vertices are tied
+    y_facets = normals[strict, :-1] / normals[strict, -1:]
+
+    num_points, k = lifted.shape[0], Y.shape[1]
+    y_sums = np.zeros((num_points, k))
+    y_counts = np.zeros(num_points)
+    np.add.at(y_sums, simplices.ravel(), np.repeat(y_facets, k + 1, axis=0))
+    np.add.at(y_counts, simplices.ravel(), 1)
+
+    indices = candidates[y_counts[candidates] > 0]
+    y_witness = y_sums[indices] / y_counts[indices, None]
+
+    # only points of the polytope are valid witnesses
+    hull_Y = ConvexHull(Y)
+    inside = np.all(
+        y_witness @ hull_Y.equations[:, :-1].T + hull_Y.equations[:, -1]
+        < -_GEOMETRIC_TOL,
+        axis=1,
+    )
+
+    return candidates, y_witness[inside]
+
+
+def geometric_candidates(alphas: np.ndarray, U, max_rank: Optional[int] = 5):
+    """Candidate vectors of the upper envelope, and witness points for them.
+
+    The vectors are mapped to their values on the simplex image of `U`,
+    parameterized in the k-dimensional coordinates of its affine hull;  for
+    k=1, the envelope of the resulting lines is computed by sorting, and for
+    larger k from the convex hull of the lifted points.  Vectors which are not
+    candidates are never the strict maximizer at any point.  Returns None if
+    the rank of the image exceeds `max_rank`, or if the geometry is
+    degenerate.
+    """
+    c, B = _affine_coordinates(U)
+    k = B.shape[1]
+    if max_rank is not None and k + 1 > max_rank:
+        return None
+
+    if k == 0:
+        # a single point, which is one of the sampled corners
+        return np.empty(0, dtype=int), np.empty((0, U.shape[1]))
+
+    g, h = alphas @ B, alphas @ c
+    Y = (U - c) @ B
+
+    if k == 1:
+        candidates, y_witness = _envelope_1d(
+            g[:, 0], h, Y[:, 0].min(), Y[:, 0].max()
+        )
+        y_witness = y_witness[:, None]
+
+    else:
+        if alphas.shape[0] < k + 2:
+            return None
+
+        try:
+            from scipy.spatial import QhullError
+        except ImportError:
+            from scipy.spatial.qhull import QhullError
+
+        try:
+            candidates, y_witness = _envelope_hull(np.column_stack([g, h]), Y)
+        except (QhullError, ValueError):
+            return None
+
+    return candidates, c + y_witness @ B.T
+
+
+def _corner_maximizers(values: np.ndarray) -> np.ndarray:
+    """Indices of the lexicographic maximizers of the (N, S) corner `values`.
+
+    At each corner s, the maximizer of the value at s, with ties broken by the
+    values at corners 0, 1, ..., is on the upper envelope.
+    """
+    keys = list(values.T[::-1])
+    return np.array(
+        [np.lexsort(keys + [values[:, s]])[-1] for s in range(values.shape[1])]
+    )
+
+
+def _gap_upper_bounds(
+    values_F: np.ndarray, values_W: np.ndarray, chunk_size: int = 1_000_000
+) -> np.ndarray:
+    """Upper bounds on the gaps of vectors F over the envelope of vectors W.
+
+    The gap of f over the envelope is at most its largest difference at the
+    simplex corners with any single w, i.e. min_w max_s (f - w) @ U[s].
+    """
+    num_F, num_W = values_F.shape[0], values_W.shape[0]
+    if num_W == 0:
+        return np.full(num_F, np.inf)
+
+    bounds = np.empty(num_F)
+    step = max(1, chunk_size // (num_W * values_F.shape[1]))
+    for i in range(0, num_F, step):
+        diffs = values_F[i : i + step, None, :] - values_W[None, :, :]
+        bounds[i : i + step] = diffs.max(2).min(1)
+
+    return bounds
+
+
 def dominationCheck(
     objects: List[T], U, key: Optional[ArrayKey] = None
 ) -> List[T]:
@@ -64,35 +609,170 @@ def dominationCheck(
     return [objects[i] for i in indices]
 
 
-def _purge_indices(F, U, *args, **kwargs):
+def _dominate_shared(
+    refs: Dict[str, SharedArrayRef],
+    index: int,
+    indices_W: List[int],
+    *args,
+    **kwargs,
+):
+    arrays = attach_refs(refs)
+    alphas = arrays['alphas']
+    return dominate(
+        alphas[index], alphas[indices_W], arrays['U'], *args, **kwargs
+    )
+
+
+def _purge_indices(
+    F,
+    U,
+    *args,
+    points=None,
+    num_samples: int = 100,
+    witnesses=None,
+    stats=None,
+    backend: str = 'auto',
+    max_geometric_rank: int = 5,
+    executor: Optional[Executor] = None,
+    batch_size: int = 8,
+    **kwargs,
+):
+    if backend not in PURGE_BACKENDS:
+        raise ValueError(f'Invalid purge backend {backend}')
+
+    if batch_size < 1:
+        raise ValueError(f'Invalid batch size {batch_size}')
+
+    if kwargs.get('lp_backend', 'cvxpy') not in LP_BACKENDS:
+        raise ValueError(f'Invalid LP backend {kwargs["lp_backend"]}')
+
+    eps = kwargs.get('eps', 0.0)
+
     alphas = np.row_stack(F)
+    values = alphas @ U.T
     indices_F = set(range(len(F)))
-    # this has a problem with lexicographic order
-    # both alpha vectors will be chosen [[0, 0, 1], [0 1 1]]
-    # indices_W = set(np.argmax(alphas @ U.T, axis=0))
-    k = max(range(len(F)), key=lambda i: (F[i] @ U.T).tolist())
-    indices_W = set([k])
+    # a plain argmax has a problem with ties, e.g. both alpha vectors would be
+    # chosen in [[0, 0, 1], [0 1 1]];  the lexicographic maximizers are fine
+    indices_W = set(_corner_maximizers(values).tolist())
+
+    # vectors which strictly win at a sampled or stored point need no LP
+    X = sample_points(U, num_samples, points)
+
+    # vectors off the upper envelope need no LP either
+    geometric = None
+    if backend != 'lp' and len(F) > 2:
+        max_rank = max_geometric_rank if backend == 'auto' else None
+        geometric = geometric_candidates(alphas, U, max_rank)
+
+    if geometric is not None:
+        candidates, X_geometric = geometric
+        X = np.concatenate([X, X_geometric])
+
+        indices_rejected = indices_F - indices_W - set(candidates.tolist())
+        indices_F.difference_update(indices_rejected)
+        if stats is not None:
+            stats.num_rejected += len(indices_rejected)
+
+    num_sampled = X.shape[0]
+    X_witnesses = None if witnesses is None else witnesses.points(U.shape[1])
+    if X_witnesses is not None:
+        X = np.concatenate([X, X_witnesses])
+
+    maximizers = _strict_maximizers(alphas, X, eps)
+    indices_W.update(maximizers[maximizers >= 0].tolist())
     indices_F.difference_update(indices_W)
-
-    while indices_F:
-        # print(f'{len(indices_F)} alphas left')
-        k = next(iter(indices_F))
-        alpha = F[k]
-        alphas = np.row_stack([F[i] for i in indices_W if i != k])
-
-        x = dominate(alpha, alphas, U, *args, **kwargs)
-
-        if x is None:
-            # alpha is redundant by alphas
-            indices_F.difference_update([k])
-        else:
-            # alpha is NOT redundant by alphas
-            indices_F_list = list(indices_F)
-            alphas = np.row_stack([F[i] for i in indices_F_list])
-            k = np.argmax(alphas @ x)
-            k = indices_F_list[k]
-            indices_W.add(k)
-            indices_F.difference_update([k])
+    if stats is not None:
+        stats.num_screened += len(indices_W)
+
+    if X_witnesses is not None:
+        (hits,) = np.nonzero(maximizers[num_sampled:] >= 0)
+        witnesses.touch(hits.tolist())
+
+    # candidates are processed by decreasing upper bound on their gap over W;
+    # the bounds only decrease as W grows, and below eps no LP is needed
+    indices_F_list = sorted(indices_F)
+    values_F = values[indices_F_list]
+    bounds = _gap_upper_bounds(values_F, values[sorted(indices_W)])
+    active = np.ones(len(indices_F_list), dtype=bool)
+
+    alphas_F = alphas[indices_F_list]
+    with _share(executor, alphas=alphas, U=U) as shared:
+        while active.any():
+            # with an executor, a batch of candidates is checked against the
+            # same W;  otherwise, one at a time
+            (actives,) = np.nonzero(active)
+            order = actives[np.argsort(-bounds[actives], kind='stable')]
+            batch = order[: 1 if executor is None else batch_size]
+            batch = batch[bounds[batch] > eps]
+            if batch.size == 0:
+                if stats is not None:
+                    stats.num_bounded += int(active.sum())
+                break
+
+            alphas_W = alphas[sorted(indices_W)]
+            if executor is None:
+                xs = [
+                    dominate(alphas_F[batch[0]], alphas_W, U, *args, **kwargs)
+                ]
+            elif shared is None:
+                futures = [
+                    executor.submit(
+                        dominate, alphas_F[j], alphas_W, U, *args, **kwargs
+                    )
+                    for j in batch
+                ]
+                xs = [future.result() for future in futures]
+            else:
+                # the LPs only send the indices of alpha and W to the pool
+                indices = sorted(indices_W)
+                futures = [
+                    executor.submit(
+                        _dominate_shared,
+                        shared.refs(),
+                        indices_F_list[j],
+                        indices,
+                        *args,
+                        **kwargs,
+                    )
+                    for j in batch
+                ]
+                xs = [future.result() for future in futures]
+
+            if stats is not None:
+                stats.num_lps += len(batch)
+
+            num_W = len(indices_W)
+            for j, x in zip(batch, xs):
+                if not active[j]:
+                    # already kept as the maximizer at an earlier witness
+                    continue
+
+                if x is None:
+                    # alpha is redundant by alphas, and by any larger W
+                    active[j] = False
+                    continue
+
+                # alpha is NOT redundant by alphas
+                if witnesses is not None:
+                    witnesses.add(x)
+
+                (actives,) = np.nonzero(active)
+                values_x = alphas_F[actives] @ x
+                i = np.argmax(values_x)
+                if len(indices_W) > num_W:
+                    # W grew since the LP was solved;  the maximizer at x is
+                    # only kept if it still beats W there, otherwise alpha is
+                    # re-queued
+                    value_W = (alphas[sorted(indices_W)] @ x).max()
+                    if values_x[i] <= value_W + eps:
+                        continue
+
+                i = actives[i]
+                indices_W.add(indices_F_list[i])
+                active[i] = False
+
+                gaps = (values_F - values_F[i]).max(1)
+                np.minimum(bounds, gaps, out=bounds)
 
     return indices_W
 
@@ -113,6 +793,8 @@ def inc_prune(
 
 
 def dominate_scipy(alpha, A, U, *, eps=0.0):
+    from scipy.optimize import linprog
+
     if eps < 0.0:
         raise ValueError('Negative epsilon ({eps})')
 
@@ -156,6 +838,8 @@ def dominate_scipy(alpha, A, U, *, eps=0.0):
 
 
 def dominate_cvxpy(alpha, A, U, *, eps=0.0):
+    import cvxpy as cp
+
     if eps < 0.0:
         raise ValueError('Negative epsilon ({eps})')
 
@@ -203,6 +887,7 @@ def dominate_cvxpy(alpha, A, U, *, eps=0.0):
 
 def dominate_cylp(alpha, A, U, *, eps=0.0):
     # TODO fix / cleanup this method
+    from cylp.cy import CyClpSimplex
 
     if eps < 0.0:
         raise ValueError('Negative epsilon ({eps})')
@@ -236,6 +921,29 @@ def dominate_cylp(alpha, A, U, *, eps=0.0):
     return U.T @ b
 
 
-# dominate = dominate_scipy
-dominate = dominate_cvxpy
-# dominate = dominate_cylp
+# LP solvers of the domination check;  each one imports its solver library
+# only when it is first called
+LP_BACKENDS: Dict[str, Callable] = {
+    'scipy': dominate_scipy,
+    'cvxpy': dominate_cvxpy,
+    'cylp': dominate_cylp,
+}
+
+
+def register_lp_backend(name: str, function: Callable):
+    """Register `function(alpha, A, U, *, eps)` as the LP backend `name`."""
+    LP_BACKENDS[name] = function
+
+
+def dominate(alpha, A, U, *, eps=0.0, lp_backend: str = 'cvxpy'):
+    """Witness point where `alpha` beats all of `A` by more than `eps`.
+
+    Returns None if there is no such point.  The LP is solved by the
+    registered `lp_backend`.
+    """
+    try:
+        function = LP_BACKENDS[lp_backend]
+    except KeyError as error:
+        raise ValueError(f'Invalid LP backend {lp_backend}') from error
+
+    return function(alpha, A, U, eps=eps)
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import logging
 from functools import lru_cache
 from typing import FrozenSet
 
 import numpy as np
 import numpy.linalg as la
 from rl_rpsr.core import Interaction, Test
+from rl_rpsr.linalg import grouped_vecmat, simplex_lstsq
 from rl_rpsr.pomdp import POMDP_Model
 
 from .search import outcome, outcome_matrix
@@ -14,6 +16,11 @@ __all__ = ['PSR_Model']
 
 
 class PSR_Model:
+    # arrays which fully determine the model, see `from_arrays`
+    ARRAYS = ('U', 'U_PI', 'M_ao', 'M_aoQ', 'm_ao', 'R', 'start')
+    # arrays which propagate the states, see `astype`
+    DYNAMICS_ARRAYS = ('M_aoQ', 'm_ao', 'R', 'start')
+
     def __init__(self, pomdp_model: POMDP_Model, Q: FrozenSet[Test]):
         self.pomdp_model = pomdp_model
 
@@ -52,10 +59,45 @@ class PSR_Model:
         # (|Q|, |A|) array
         self.R = self.U_PI @ pomdp_model.R
 
+        self.start = self.psr(pomdp_model.start)
+
+        self._init_attributes()
+
+    @classmethod
+    def from_arrays(cls, pomdp_model: POMDP_Model, arrays) -> PSR_Model:
+        """Make a model from its precomputed `ARRAYS`, e.g. from a cache."""
+        model = cls.__new__(cls)
+        model.pomdp_model = pomdp_model
+        for name in cls.ARRAYS:
+            setattr(model, name, arrays[name])
+
+        model._init_attributes()  # pylint: disable=protected-access
+        return model
+
+    def astype(self, dtype) -> PSR_Model:
+        """Copy of the model which propagates states in `dtype`.
+
+        Only the `DYNAMICS_ARRAYS` are cast, while the outcome matrices keep
+        their precision for `project` and `normalize`.  The model itself is
+        returned if no cast is needed.
+        """
+        if all(
+            getattr(self, name).dtype == dtype for name in self.DYNAMICS_ARRAYS
+        ):
+            return self
+
+        arrays = {name: getattr(self, name) for name in self.ARRAYS}
+        for name in self.DYNAMICS_ARRAYS:
+            arrays[name] = arrays[name].astype(dtype)
+
+        return self.from_arrays(self.pomdp_model, arrays)
+
+    def _init_attributes(self):
+        pomdp_model = self.pomdp_model
+
         self.discount = pomdp_model.discount
         self.actions = pomdp_model.actions
         self.observations = pomdp_model.observations
-        self.start = self.psr(pomdp_model.start)
 
         self.action_space = pomdp_model.action_space
         self.observation_space = pomdp_model.observation_space
@@ -64,6 +106,19 @@ class PSR_Model:
 
         self.rank = self.U.shape[1]
 
+        # `normalize` rescales the predicted probability of the observations,
+        # which is the total belief only if the ones vector is in the span of
+        # the outcomes, i.e. not for some truncated cores
+        ones = np.ones(self.U.shape[0])
+        residual = la.norm(self.U @ self.U_PI.sum(1) - ones)
+        if residual > np.sqrt(np.finfo(np.float64).eps) * la.norm(ones):
+            logger = logging.getLogger(__name__)
+            logger.warning(
+                'ones vector is not in the span of the outcomes, residual %g;  '
+                'normalized states may not have normalized beliefs',
+                residual,
+            )
+
     def outcome(self, test: Test):
         return outcome(self.pomdp_model, test)
 
@@ -73,12 +128,46 @@ class PSR_Model:
     def psr(self, belief):
         return belief @ self.U
 
+    def project(self, state):
+        """Project `state` onto the valid PSR states `b @ U`, beliefs `b`.
+
+        The belief is found by simplex-constrained least squares, and valid
+        states, i.e. those within rounding errors of their projection, are
+        returned unchanged.
+        """
+        belief, residual = simplex_lstsq(self.U, state)
+        tol = np.sqrt(np.finfo(state.dtype).eps) * max(1.0, la.norm(state))
+        if residual <= tol:
+            return state
+
+        return self.psr(belief).astype(state.dtype, copy=False)
+
+    def normalize(self, state):
+        """Rescale `state` so that its predicted observation probabilities sum
+        to 1, in float64.
+
+        The total `state @ m_ao[a].sum(0)` is `state @ U_PI.sum(1)` for any
+        action `a`, and also the total of the belief if the ones vector is in
+        the span of `U`, which is checked when the model is built.
+        """
+        state64 = state.astype(np.float64, copy=False)
+        total = state64 @ self.U_PI.sum(1)
+        if total <= 0.0:
+            return state
+
+        return (state64 / total).astype(state.dtype, copy=False)
+
     @lru_cache(maxsize=None)
     def _m(self, test: Test):
         # TODO decompose outcome(intent) into individual matrices stuff
         # return self.U_PI @ self.M(intent.test) @ self...
         return self.U_PI @ self.outcome(test)
 
+    @property
+    def transitions(self):
+        """(|A|, |O|, |Q|, |Q|) unnormalized `dynamics` matrices."""
+        return self.M_aoQ
+
     def dynamics(self, state, action, observation):
         M = self.M_aoQ[action, observation]
         m = self.m_ao[action, observation]
@@ -90,5 +179,19 @@ class PSR_Model:
     def expected_reward(self, state, action):
         return state @ self.R[:, action]
 
+    def dynamics_batch(self, states, actions, observations):
+        """Batched `dynamics`, with (K, |Q|) `states` and (K,) indices."""
+        M = grouped_vecmat(states, self.M_aoQ, actions, observations)
+        m = np.einsum('ki,ki->k', states, self.m_ao[actions, observations])
+        return M / m[:, None]
+
+    def observation_probs_batch(self, states, actions):
+        """Batched `observation_probs`, returns a (K, |O|) array."""
+        return np.einsum('ki,koi->ko', states, self.m_ao[actions])
+
+    def expected_reward_batch(self, states, actions):
+        """Batched `expected_reward`, returns a (K,) array."""
+        return np.einsum('ki,ik->k', states, self.R[:, actions])
+
     def R_as_pomdp(self):
         return self.U @ self.R
@@ -1,11 +1,17 @@
 import logging
-from typing import FrozenSet
+from typing import Dict, FrozenSet, Optional
 
 import numpy as np
 from rl_rpsr.core import Test, Tests
 from rl_rpsr.linalg import linearly_independent
 from rl_rpsr.pomdp import POMDP_Model
-from rl_rpsr.search import Searcher
+from rl_rpsr.search import (
+    IndependenceOracle,
+    Searcher,
+    SearchStats,
+    check_bounds,
+    search_dfs,
+)
 from rl_rpsr.util import SearchType, interactions
 
 __all__ = ['searcher_factory']
@@ -42,13 +48,21 @@ def independent(model: POMDP_Model, test: Test, Q: FrozenSet[Test]) -> bool:
     return ret
 
 
-def searcher_factory(search_type: SearchType) -> Searcher:
+def searcher_factory(
+    search_type: SearchType,
+    max_depth: Optional[int] = None,
+    max_nodes: Optional[int] = None,
+) -> Searcher:
     if search_type == SearchType.BFS:
         return BFS_PSR_Searcher()
 
     if search_type == SearchType.DFS:
         return DFS_PSR_Searcher()
 
+    if search_type == SearchType.BOUNDED_DFS:
+        check_bounds(max_depth, max_nodes)
+        return DFS_PSR_Searcher(max_depth=max_depth, max_nodes=max_nodes)
+
     raise ValueError(f'No implementation for search type {search_type}')
 
 
@@ -79,21 +93,43 @@ class BFS_PSR_Searcher(Searcher):
 
 
 class DFS_PSR_Searcher(Searcher):
-    def search(self, model: POMDP_Model) -> Tests:
-        Q = _search_dfs(model, Test.empty(), frozenset())
-        return Tests(tuple(Q))
-
-
-def _search_dfs(
-    model: POMDP_Model, test: Test, Q: FrozenSet[Test]
-) -> FrozenSet[Test]:
-
-    for interaction in interactions(
-        model.action_space, model.observation_space
+    def __init__(
+        self, max_depth: Optional[int] = None, max_nodes: Optional[int] = None
     ):
-        test_extended = test.prepend(interaction)
-        if independent(model, test_extended, Q):
-            Q_extended = Q.union({test_extended})
-            Q = _search_dfs(model, test_extended, Q_extended)
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
 
-    return Q
+    def search(self, model: POMDP_Model) -> Tests:
+        self.stats = SearchStats()
+        Q: IndependenceOracle[Test] = IndependenceOracle(
+            model.state_space.n, self.stats
+        )
+
+        # outcome vectors of the root and of the tests in Q, from which the
+        # outcome vectors of their extensions are computed
+        outcomes: Dict[Test, np.ndarray] = {
+            Test.empty(): np.ones(model.state_space.n)
+        }
+
+        def visit(test: Test) -> bool:
+            if test.tail is None:
+                return True
+
+            interaction = test.head
+            G = model.G[interaction.action, interaction.observation]
+            u = G.T @ outcomes[test.tail]
+            if not Q.add(test, u):
+                return False
+
+            outcomes[test] = u
+            return True
+
+        search_dfs(
+            model,
+            visit,
+            self.stats,
+            max_depth=self.max_depth,
+            max_nodes=self.max_nodes,
+        )
+
+        return Tests(tuple(Q.elements))
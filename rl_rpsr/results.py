@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import os
+from typing import Dict, Iterable, Iterator, Mapping, Sequence
+
+import numpy as np
+
+__all__ = [
+    'ResultsWriter',
+    'read_results',
+    'is_results_file',
+    'OnlineStats',
+    'error_stats',
+]
+
+_NPY_MAGIC = b'\x93NUMPY'
+
+
+class ResultsWriter:
+    """Appends evaluation returns to a file, as a stream of `.npy` chunks.
+
+    Each record holds the `pomdp`, `env`, `policy` and `simulation` index,
+    followed by one return field per evaluation model.  Records are buffered
+    and appended in chunks of `chunk_size` records, so several runs can append
+    to the same file one after the other.  Names longer than their fixed-width
+    field are rejected rather than truncated.
+    """
+
+    def __init__(
+        self, filename: str, models: Sequence[str], chunk_size: int = 1_000
+    ):
+        if chunk_size < 1:
+            raise ValueError(f'invalid chunk size {chunk_size}')
+
+        self.filename = filename
+        self.models = list(models)
+        self.chunk_size = chunk_size
+
+        self.dtype = np.dtype(
+            [
+                ('pomdp', 'U64'),
+                ('env', 'U16'),
+                ('policy', 'U16'),
+                ('simulation', 'i8'),
+            ]
+            + [(model, 'f8') for model in self.models]
+        )
+        self._records: list = []
+
+    def write(
+        self,
+        pomdp: str,
+        env: str,
+        policy: str,
+        simulation: int,
+        returns: Mapping[str, float],
+    ):
+        for field, name in [('pomdp', pomdp), ('env', env), ('policy', policy)]:
+            # unicode fields take 4 bytes per character
+            width = self.dtype[field].itemsize // 4
+            if len(name) > width:
+                raise ValueError(
+                    f'{field} name {name!r} longer than {width} characters'
+                )
+
+        record = (pomdp, env, policy, simulation) + tuple(
+            returns.get(model, float('nan')) for model in self.models
+        )
+        self._records.append(record)
+
+        if len(self._records) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._records:
+            return
+
+        chunk = np.array(self._records, dtype=self.dtype)
+        with open(self.filename, 'ab') as f:
+            np.save(f, chunk)
+
+        self._records.clear()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self) -> ResultsWriter:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def is_results_file(filename: str) -> bool:
+    """Whether `filename` was written by a `ResultsWriter`."""
+    with open(filename, 'rb') as f:
+        return f.read(len(_NPY_MAGIC)) == _NPY_MAGIC
+
+
+def read_results(filename: str) -> Iterator[np.ndarray]:
+    """Generator of the record chunks of a `ResultsWriter` file."""
+    with open(filename, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        while f.tell() < size:
+            yield np.load(f)
+
+
+class OnlineStats:
+    """Streaming count, mean and variance of a sequence of values.
+
+    Batches are merged with the pairwise update of Chan et al., so memory is
+    constant in the number of values.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, values) -> OnlineStats:
+        values = np.asarray(values, dtype=float).ravel()
+        count = values.size
+        if count == 0:
+            return self
+
+        mean = values.mean()
+        m2 = ((values - mean) ** 2).sum()
+
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self._m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+
+        return self
+
+    def var(self, ddof: int = 1) -> float:
+        if self.count <= ddof:
+            return float('nan')
+
+        return self._m2 / (self.count - ddof)
+
+    def std(self, ddof: int = 1) -> float:
+        return np.sqrt(self.var(ddof))
+
+    def rms(self) -> float:
+        """Root mean square, i.e. the RMSE if the values are errors."""
+        if self.count == 0:
+            return float('nan')
+
+        return np.sqrt(self.var(ddof=0) + self.mean ** 2)
+
+
+def error_stats(
+    chunks: Iterable[Mapping[str, np.ndarray]], names: Sequence[str]
+) -> Dict[str, OnlineStats]:
+    """Streaming stats of the return errors of `names` w.r.t. the first one.
+
+    `chunks` map each name to its returns, e.g. DataFrames or record arrays.
+    Rows where either return is NaN, e.g. models missing from some of the runs
+    appended to a file, are dropped column by column.
+    """
+    stats = {name: OnlineStats() for name in names}
+    for chunk in chunks:
+        baseline = np.asarray(chunk[names[0]], dtype=float)
+        for name in names:
+            errors = baseline - np.asarray(chunk[name], dtype=float)
+            stats[name].update(errors[~np.isnan(errors)])
+
+    return stats
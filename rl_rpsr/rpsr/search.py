@@ -1,12 +1,18 @@
 import logging
 from functools import lru_cache
-from typing import FrozenSet
+from typing import Dict, FrozenSet, Optional
 
 import numpy as np
 from rl_rpsr.core import Intent, Intents, Test
 from rl_rpsr.linalg import linearly_independent
 from rl_rpsr.pomdp import POMDP_Model
-from rl_rpsr.search import Searcher
+from rl_rpsr.search import (
+    IndependenceOracle,
+    Searcher,
+    SearchStats,
+    check_bounds,
+    search_dfs,
+)
 from rl_rpsr.util import SearchType, interactions
 
 __all__ = ['searcher_factory']
@@ -51,13 +57,21 @@ def independent(
     return ret
 
 
-def searcher_factory(search_type: SearchType) -> Searcher:
+def searcher_factory(
+    search_type: SearchType,
+    max_depth: Optional[int] = None,
+    max_nodes: Optional[int] = None,
+) -> Searcher:
     if search_type == SearchType.BFS:
         return BFS_RPSR_Searcher()
 
     if search_type == SearchType.DFS:
         return DFS_RPSR_Searcher()
 
+    if search_type == SearchType.BOUNDED_DFS:
+        check_bounds(max_depth, max_nodes)
+        return DFS_RPSR_Searcher(max_depth=max_depth, max_nodes=max_nodes)
+
     raise ValueError(f'No implementation for search type {search_type}')
 
 
@@ -86,23 +100,46 @@ class BFS_RPSR_Searcher(Searcher):
 
 
 class DFS_RPSR_Searcher(Searcher):
-    def search(self, model: POMDP_Model) -> Intents:
-        I = _search_dfs(model, Test.empty(), frozenset())
-        return Intents(tuple(I))
-
+    def __init__(
+        self, max_depth: Optional[int] = None, max_nodes: Optional[int] = None
+    ):
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
 
-def _search_dfs(
-    model: POMDP_Model, test: Test, I: FrozenSet[Intent]
-) -> FrozenSet[Intent]:
-
-    for z in range(-1, model.action_space.n):
-        intent = Intent(test, z)
-        if independent(model, intent, I):
-            for interaction in interactions(
-                model.action_space, model.observation_space
-            ):
-                test_extended = test.prepend(interaction)
-                I_extended = I.union([intent])
-                I = _search_dfs(model, test_extended, I_extended)
-
-    return I
+    def search(self, model: POMDP_Model) -> Intents:
+        self.stats = SearchStats()
+        I: IndependenceOracle[Intent] = IndependenceOracle(
+            model.state_space.n, self.stats
+        )
+
+        # (|S|, 1 + |A|) outcome matrices of the tests with an intent in I,
+        # where column `1 + z` is the outcome vector of the intent `(test, z)`
+        outcomes: Dict[Test, np.ndarray] = {}
+
+        def visit(test: Test) -> bool:
+            if test.tail is None:
+                V = np.column_stack([np.ones(model.state_space.n), model.R])
+            else:
+                interaction = test.head
+                G = model.G[interaction.action, interaction.observation]
+                V = G.T @ outcomes[test.tail]
+
+            added = [
+                I.add(Intent(test, z), V[:, z + 1])
+                for z in range(-1, model.action_space.n)
+            ]
+            if not any(added):
+                return False
+
+            outcomes[test] = V
+            return True
+
+        search_dfs(
+            model,
+            visit,
+            self.stats,
+            max_depth=self.max_depth,
+            max_nodes=self.max_nodes,
+        )
+
+        return Intents(tuple(I.elements))
@@ -1,11 +1,308 @@
 import abc
-from typing import Union
+import logging
+from dataclasses import dataclass
+from typing import (
+    Callable,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
-from rl_rpsr.core import Intents, Tests
+import numpy as np
+from rl_rpsr.core import Intent, Intents, Test, Tests
+from rl_rpsr.linalg import linearly_independent
 from rl_rpsr.pomdp import POMDP_Model
+from rl_rpsr.util import SearchType, interactions
+
+__all__ = [
+    'Searcher',
+    'JointSearcher',
+    'joint_searcher_factory',
+    'SearchStats',
+    'IndependenceOracle',
+    'check_bounds',
+    'search_dfs',
+]
+
+
+@dataclass
+class SearchStats:
+    """Progress statistics of a depth-first core search."""
+
+    num_nodes: int = 0
+    num_checks: int = 0
+    num_added: int = 0
+    max_depth: int = 0
+    num_cutoffs: int = 0
+    exhausted: bool = False
 
 
 class Searcher(metaclass=abc.ABCMeta):
+    stats: Optional[SearchStats] = None
+
     @abc.abstractmethod
     def search(self, model: POMDP_Model) -> Union[Tests, Intents]:
         raise NotImplementedError
+
+
+class JointSearcher(metaclass=abc.ABCMeta):
+    """Searches the PSR and RPSR cores of a model in a single pass.
+
+    The outcome of the PSR test `t` is the outcome of the RPSR intent `(t,
+    -1)`, and the outcomes of the other intents `(t, a)` are propagated
+    through the same chain of `G_{ao}^\\top` matrices;  hence the outcome
+    matrix `[1 | R]` of each visited test is computed once, from that of its
+    tail, and shared by the two independence oracles.
+    """
+
+    stats: Optional[SearchStats] = None
+
+    @abc.abstractmethod
+    def search(self, model: POMDP_Model) -> Tuple[Tests, Intents]:
+        raise NotImplementedError
+
+
+def joint_searcher_factory(
+    search_type: SearchType,
+    max_depth: Optional[int] = None,
+    max_nodes: Optional[int] = None,
+) -> JointSearcher:
+    if search_type == SearchType.BFS:
+        return BFS_JointSearcher()
+
+    if search_type == SearchType.DFS:
+        return DFS_JointSearcher()
+
+    if search_type == SearchType.BOUNDED_DFS:
+        check_bounds(max_depth, max_nodes)
+        return DFS_JointSearcher(max_depth=max_depth, max_nodes=max_nodes)
+
+    raise ValueError(f'No implementation for search type {search_type}')
+
+
+def check_bounds(max_depth: Optional[int], max_nodes: Optional[int]):
+    if max_depth is None and max_nodes is None:
+        raise ValueError('bounded search requires `max_depth` or `max_nodes`')
+
+    if max_depth is not None and max_depth < 0:
+        raise ValueError(f'invalid maximum depth {max_depth}')
+
+    if max_nodes is not None and max_nodes < 1:
+        raise ValueError(f'invalid maximum number of nodes {max_nodes}')
+
+
+def search_dfs(
+    model: POMDP_Model,
+    visit: Callable[[Test], bool],
+    stats: SearchStats,
+    *,
+    max_depth: Optional[int] = None,
+    max_nodes: Optional[int] = None,
+    log_period: int = 1_000,
+):
+    """Depth-first search of the test tree, with an explicit stack.
+
+    `visit(test)` checks the core elements of `test`, and returns whether its
+    extensions should be visited next.  Each test is visited at most once,
+    tests longer than `max_depth` are cut off, and the search stops after
+    `max_nodes` visits.
+    """
+    logger = logging.getLogger(__name__)
+
+    visited: Set[Test] = set()
+    stack = [iter([Test.empty()])]
+    while stack:
+        test = next(stack[-1], None)
+        if test is None:
+            stack.pop()
+            continue
+
+        if test in visited:
+            continue
+
+        if max_depth is not None and len(test) > max_depth:
+            stats.num_cutoffs += 1
+            continue
+
+        if max_nodes is not None and stats.num_nodes >= max_nodes:
+            logger.warning('search stopped after %d nodes', stats.num_nodes)
+            stats.exhausted = True
+            break
+
+        visited.add(test)
+        stats.num_nodes += 1
+        stats.max_depth = max(stats.max_depth, len(test))
+        if stats.num_nodes % log_period == 0:
+            logger.info('search progress %s', stats)
+
+        if visit(test):
+            stack.append(_extensions(model, test))
+
+    logger.info('search stats %s', stats)
+
+
+def _extensions(model: POMDP_Model, test: Test) -> Iterator[Test]:
+    for interaction in interactions(
+        model.action_space, model.observation_space
+    ):
+        yield test.prepend(interaction)
+
+
+class _Outcomes:
+    """Cached (|S|, 1 + |A|) outcome matrices of tests.
+
+    Column 0 is the outcome of the test, and column `1 + a` is the outcome of
+    the intent with reward action `a`.
+    """
+
+    def __init__(self, model: POMDP_Model):
+        self.model = model
+        W = np.column_stack([np.ones(model.state_space.n), model.R])
+        self._cache: Dict[Test, np.ndarray] = {Test.empty(): W}
+
+    def __call__(self, test: Test) -> np.ndarray:
+        try:
+            return self._cache[test]
+        except KeyError:
+            pass
+
+        logger = logging.getLogger(__name__)
+        logger.debug('computing outcome matrix of %s', test)
+
+        interaction = test.head
+        G = self.model.G[interaction.action, interaction.observation]
+        W = self._cache[test] = G.T @ self(test.tail)
+        return W
+
+    def test(self, test: Test) -> np.ndarray:
+        return self(test)[:, 0]
+
+    def intent(self, intent: Intent) -> np.ndarray:
+        return self(intent.test)[:, intent.action + 1]
+
+
+T = TypeVar('T')
+
+
+class IndependenceOracle(Generic[T]):
+    """Linearly independent core, grown one element at a time."""
+
+    def __init__(self, dim: int, stats: Optional[SearchStats] = None):
+        self.dim = dim
+        self.stats = stats
+        self.elements: List[T] = []
+        self.vectors: List[np.ndarray] = []
+
+    def add(self, element: T, vector: np.ndarray) -> bool:
+        """Add `element` if its outcome `vector` is independent of the core."""
+        if len(self.vectors) == self.dim:
+            return False
+
+        ret = linearly_independent(self.vectors, vector)
+        logging.getLogger(__name__).debug(
+            'independence of %s result %s', element, ret
+        )
+        if ret:
+            self.elements.append(element)
+            self.vectors.append(vector)
+
+        if self.stats is not None:
+            self.stats.num_checks += 1
+            self.stats.num_added += ret
+
+        return ret
+
+
+class BFS_JointSearcher(JointSearcher):
+    def search(self, model: POMDP_Model) -> Tuple[Tests, Intents]:
+        outcomes = _Outcomes(model)
+        Q: IndependenceOracle[Test] = IndependenceOracle(model.state_space.n)
+        I: IndependenceOracle[Intent] = IndependenceOracle(model.state_space.n)
+
+        for interaction in interactions(
+            model.action_space, model.observation_space
+        ):
+            test = interaction.as_test()
+            Q.add(test, outcomes.test(test))
+
+        for z in range(-1, model.action_space.n):
+            intent = Intent(Test.empty(), z)
+            I.add(intent, outcomes.intent(intent))
+
+        added = True
+        while added:
+            added = False
+            for test in tuple(Q.elements):
+                for interaction in interactions(
+                    model.action_space, model.observation_space
+                ):
+                    test_extended = test.prepend(interaction)
+                    if Q.add(test_extended, outcomes.test(test_extended)):
+                        added = True
+
+            for intent in tuple(I.elements):
+                for interaction in interactions(
+                    model.action_space, model.observation_space
+                ):
+                    intent_extended = intent.prepend(interaction)
+                    if I.add(intent_extended, outcomes.intent(intent_extended)):
+                        added = True
+
+        return Tests(tuple(Q.elements)), Intents(tuple(I.elements))
+
+
+class DFS_JointSearcher(JointSearcher):
+    def __init__(
+        self, max_depth: Optional[int] = None, max_nodes: Optional[int] = None
+    ):
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+
+    def search(self, model: POMDP_Model) -> Tuple[Tests, Intents]:
+        self.stats = SearchStats()
+        outcomes = _Outcomes(model)
+        n = model.state_space.n
+        Q: IndependenceOracle[Test] = IndependenceOracle(n, self.stats)
+        I: IndependenceOracle[Intent] = IndependenceOracle(n, self.stats)
+
+        # tests whose extensions are searched by the PSR and by the RPSR, i.e.
+        # the root and the tests with an element in the respective core
+        psr_tests: Set[Test] = set()
+        rpsr_tests: Set[Test] = set()
+
+        def add_intents(test: Test) -> bool:
+            intents = [Intent(test, z) for z in range(-1, model.action_space.n)]
+            return any([I.add(x, outcomes.intent(x)) for x in intents])
+
+        def visit(test: Test) -> bool:
+            if test.tail is None:
+                search_psr = True
+                search_rpsr = add_intents(test)
+            else:
+                search_psr = test.tail in psr_tests and Q.add(
+                    test, outcomes.test(test)
+                )
+                search_rpsr = test.tail in rpsr_tests and add_intents(test)
+
+            if search_psr:
+                psr_tests.add(test)
+            if search_rpsr:
+                rpsr_tests.add(test)
+
+            return search_psr or search_rpsr
+
+        search_dfs(
+            model,
+            visit,
+            self.stats,
+            max_depth=self.max_depth,
+            max_nodes=self.max_nodes,
+        )
+
+        return Tests(tuple(Q.elements)), Intents(tuple(I.elements))
@@ -1,16 +1,18 @@
 import abc
 import sys
-from typing import Any, Union
+from typing import Any, Dict, Optional, Tuple, Union
 
 import numpy as np
 import yaml
-from rl_rpsr.core import Intents, Tests
+from rl_rpsr.core import Intent, Intents, Interaction, Test, Tests
 from rl_rpsr.value_function import ValueFunction
 
 __all__ = [
     'TestsSerializer',
     'IntentsSerializer',
     'CoreSerializer',
+    'CORE_FORMATS',
+    'is_binary_core',
     'VF_Serializer',
     'AlphaSerializer',
 ]
@@ -18,7 +20,8 @@ __all__ = [
 
 class Serializer(metaclass=abc.ABCMeta):
     @abc.abstractmethod
-    def dump(self, filename: str, obj):
+    def dump(self, filename: str, obj, fmt: Optional[str] = None):
+        """Dump `obj` to `filename`, in format `fmt` or the default one."""
         raise NotImplementedError
 
     @abc.abstractmethod
@@ -26,17 +29,121 @@ class Serializer(metaclass=abc.ABCMeta):
         raise NotImplementedError
 
 
+_ZIP_MAGIC = b'PK\x03\x04'
+
+CORE_FORMATS = ['yaml', 'npz']
+
+
+def _core_format(filename: str, fmt: Optional[str]) -> str:
+    if fmt is None:
+        fmt = 'npz' if filename.endswith('.npz') else 'yaml'
+
+    if fmt not in CORE_FORMATS:
+        raise ValueError(f'invalid core format {fmt}')
+
+    return fmt
+
+
+def is_binary_core(filename: str) -> bool:
+    """Whether `filename` holds a core in the binary `.npz` format."""
+    with open(filename, 'rb') as f:
+        return f.read(len(_ZIP_MAGIC)) == _ZIP_MAGIC
+
+
+def _dump_core_npz(filename: str, obj: Union[Tests, Intents]):
+    """Dump a core as flat arrays.
+
+    The interactions of all the tests are concatenated in the `actions` and
+    `observations` arrays, and test i spans `offsets[i]:offsets[i+1]`;
+    intents also store their `intent_actions`.
+    """
+    if isinstance(obj, Tests):
+        kind, tests, intent_actions = 'tests', list(obj), []
+    else:
+        kind = 'intents'
+        tests = [intent.test for intent in obj]
+        intent_actions = [intent.action for intent in obj]
+
+    interactions = [
+        (interaction.action, interaction.observation)
+        for test in tests
+        for interaction in test
+    ]
+    interactions_array = np.array(interactions, dtype=np.int64).reshape(-1, 2)
+    offsets = np.cumsum([0] + [len(test) for test in tests])
+
+    with open(filename, 'wb') as f:
+        np.savez(
+            f,
+            kind=np.array(kind),
+            actions=interactions_array[:, 0],
+            observations=interactions_array[:, 1],
+            offsets=offsets,
+            intent_actions=np.array(intent_actions, dtype=np.int64),
+        )
+
+
+def _load_core_npz(filename: str) -> Union[Tests, Intents]:
+    with np.load(filename) as data:
+        kind = str(data['kind'])
+        actions = data['actions'].tolist()
+        observations = data['observations'].tolist()
+        offsets = data['offsets'].tolist()
+        intent_actions = data['intent_actions'].tolist()
+
+    cache: Dict[Tuple[int, int], Interaction] = {}
+    interactions = [
+        cache.setdefault(key, Interaction(*key))
+        for key in zip(actions, observations)
+    ]
+    tests = [
+        Test(interactions[start:stop])
+        for start, stop in zip(offsets[:-1], offsets[1:])
+    ]
+
+    if kind == 'tests':
+        return Tests(tuple(tests))
+
+    if kind == 'intents':
+        return Intents(
+            tuple(Intent(test, a) for test, a in zip(tests, intent_actions))
+        )
+
+    raise ValueError(f'invalid core kind {kind}')
+
+
+def _dump_core(filename: str, obj: Union[Tests, Intents], fmt: Optional[str]):
+    if _core_format(filename, fmt) == 'npz':
+        _dump_core_npz(filename, obj)
+    else:
+        with open(filename, 'w') as f:
+            yaml.dump(obj, f)
+
+
+def _load_core(filename: str) -> Any:
+    """Load a core from either format."""
+    if is_binary_core(filename):
+        return _load_core_npz(filename)
+
+    with open(filename) as f:
+        return yaml.load(f, Loader=yaml.Loader)
+
+
 class TestsSerializer(Serializer):
-    def dump(self, filename: str, obj: Tests):
+    """Serializer of PSR cores.
+
+    Cores are dumped as YAML, or in the binary format if `fmt` is 'npz' or
+    the filename ends with `.npz`;  the format is detected on load.
+    """
+
+    def dump(self, filename: str, obj: Tests, fmt: Optional[str] = None):
         if not isinstance(obj, Tests):
             raise TypeError(f'object is of type {type(obj)}; expected Tests')
 
-        with open(filename, 'w') as f:
-            yaml.dump(obj, f)
+        _dump_core(filename, obj, fmt)
 
     def load(self, filename: str) -> Tests:  # pylint: disable=no-self-use
-        with open(filename) as f:
-            obj = yaml.load(f, Loader=yaml.Loader)
+        obj = _load_core(filename)
 
         if not isinstance(obj, Tests):
             raise TypeError(
@@ -47,16 +154,16 @@ class TestsSerializer(Serializer):
 
 
 class IntentsSerializer(Serializer):
-    def dump(self, filename: str, obj: Intents):
+    """Serializer of RPSR cores, in the same formats as `TestsSerializer`."""
+
+    def dump(self, filename: str, obj: Intents, fmt: Optional[str] = None):
         if not isinstance(obj, Intents):
             raise TypeError(f'object is of type {type(obj)}; expected Intents')
 
-        with open(filename, 'w') as f:
-            yaml.dump(obj, f)
+        _dump_core(filename, obj, fmt)
 
     def load(self, filename: str) -> Intents:  # pylint: disable=no-self-use
-        with open(filename) as f:
-            obj = yaml.load(f, Loader=yaml.Loader)
+        obj = _load_core(filename)
 
         if not isinstance(obj, Intents):
             raise TypeError(
@@ -67,21 +174,26 @@ class IntentsSerializer(Serializer):
 
 
 class CoreSerializer(Serializer):
-    def dump(self, filename: str, obj: Union[Tests, Intents]):
+    """Serializer of PSR or RPSR cores, in the same formats as above."""
+
+    def dump(
+        self,
+        filename: str,
+        obj: Union[Tests, Intents],
+        fmt: Optional[str] = None,
+    ):
         if not isinstance(obj, (Tests, Intents)):
             raise TypeError(
                 f'object is of type {type(obj)}; expected Tests or Intents'
             )
 
-        with open(filename, 'w') as f:
-            yaml.dump(obj, f)
+        _dump_core(filename, obj, fmt)
 
     def load(  # pylint: disable=no-self-use
         self, filename: str
     ) -> Union[Tests, Intents]:
 
-        with open(filename) as f:
-            obj = yaml.load(f, Loader=yaml.Loader)
+        obj = _load_core(filename)
 
         if not isinstance(obj, (Tests, Intents)):
             raise TypeError(
@@ -92,12 +204,17 @@ class CoreSerializer(Serializer):
 
 
 class VF_Serializer(Serializer):
-    def dump(self, filename: str, obj: ValueFunction):
+    def dump(
+        self, filename: str, obj: ValueFunction, fmt: Optional[str] = None
+    ):
         if not isinstance(obj, ValueFunction):
             raise TypeError(
                 f'object is of type {type(obj)}; expected ValueFunction'
             )
 
+        if fmt is not None:
+            raise ValueError(f'invalid value function format {fmt}')
+
         with open(filename, 'w') as f:
             yaml.dump(obj, f)
 
@@ -117,12 +234,17 @@ class VF_Serializer(Serializer):
 
 
 class AlphaSerializer(Serializer):
-    def dump(self, filename: str, obj: ValueFunction):
+    def dump(
+        self, filename: str, obj: ValueFunction, fmt: Optional[str] = None
+    ):
         if not isinstance(obj, ValueFunction):
             raise TypeError(
                 f'object is of type {type(obj)}; expected ValueFunction'
             )
 
+        if fmt is not None:
+            raise ValueError(f'invalid value function format {fmt}')
+
         with open(filename, 'w') as f:
             for alpha in obj.alphas:
                 print(alpha.action, file=f)
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import itertools
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+
+import numpy as np
+
+__all__ = [
+    'SharedArrays',
+    'SharedArraysHandle',
+    'SharedArrayRef',
+    'LazySharedArrays',
+    'attach_refs',
+    'publish_model',
+    'attach_model',
+]
+
+# byte alignment of each array within the shared block
+_ALIGNMENT = 64
+
+# number of blocks kept attached by each process, see `SharedArrays.attach`
+_MAX_ATTACHED = 4
+
+
+@dataclass(frozen=True)
+class SharedArraysHandle:
+    """Picklable reference to a `SharedArrays` block.
+
+    `layout` holds the key, byte offset, shape and dtype of each array.
+    """
+
+    name: str
+    layout: Tuple[Tuple[str, int, Tuple[int, ...], str], ...]
+
+
+# picklable reference to one array of a block, i.e. its handle and key
+SharedArrayRef = Tuple[SharedArraysHandle, str]
+
+
+class SharedArrays(Mapping[str, np.ndarray]):
+    """Read-only arrays published in a single shared memory block.
+
+    The owner process `publish`es the arrays and sends the (small) `handle` to
+    the workers, which `attach` to the block and get read-only views without
+    any copy.  Closing the owner frees the block, while the workers keep the
+    last few attached blocks mapped, so that the tasks of the same publication
+    map the block only once.  Models are published with `publish_model`.
+    """
+
+    def __init__(
+        self,
+        shm: shared_memory.SharedMemory,
+        handle: SharedArraysHandle,
+        owner: bool,
+    ):
+        self._shm: Optional[shared_memory.SharedMemory] = shm
+        self.handle = handle
+        self.owner = owner
+
+        self._arrays: Dict[str, np.ndarray] = {}
+        for key, offset, shape, dtype in handle.layout:
+            array = np.ndarray(shape, dtype, buffer=shm.buf, offset=offset)
+            array.flags.writeable = False
+            self._arrays[key] = array
+
+    @classmethod
+    def publish(cls, arrays: Mapping[str, np.ndarray]) -> SharedArrays:
+        """Copy `arrays` into a new shared memory block."""
+        arrays = {key: np.asarray(array) for key, array in arrays.items()}
+
+        layout = []
+        size = 0
+        for key, array in arrays.items():
+            if array.dtype.hasobject:
+                raise ValueError(f'cannot share array {key} of objects')
+
+            offset = -(-size // _ALIGNMENT) * _ALIGNMENT
+            layout.append((key, offset, array.shape, array.dtype.str))
+            size = offset + array.nbytes
+
+        # a block can not be empty
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for (_, offset, shape, dtype), array in zip(layout, arrays.values()):
+            view = np.ndarray(shape, dtype, buffer=shm.buf, offset=offset)
+            view[...] = array
+            del view
+
+        logger = logging.getLogger(__name__)
+        logger.debug('published %d bytes in %s', size, shm.name)
+
+        shared = cls(shm, SharedArraysHandle(shm.name, tuple(layout)), True)
+        _published[shm.name] = shared
+        return shared
+
+    @classmethod
+    def attach(cls, handle: SharedArraysHandle) -> SharedArrays:
+        """Attach to the block of `handle`, or reuse an attached one."""
+        try:
+            shared = _attached.pop(handle.name)
+        except KeyError:
+            shm = shared_memory.SharedMemory(name=handle.name)
+            shared = cls(shm, handle, False)
+
+            while len(_attached) >= _MAX_ATTACHED:
+                _, evicted = _attached.popitem(last=False)
+                evicted.close()
+
+        _attached[handle.name] = shared
+        return shared
+
+    @staticmethod
+    def find(array: np.ndarray) -> Optional[SharedArrayRef]:
+        """Reference of `array` if it is a view published or attached by this
+        process, e.g. an array of a model from `attach_model`."""
+        for shared in itertools.chain(_published.values(), _attached.values()):
+            for key, view in shared.items():
+                if view is array:
+                    return shared.handle, key
+
+        return None
+
+    def close(self):
+        """Release the views and the mapping, and free the block if owned."""
+        if self._shm is None:
+            return
+
+        self._arrays.clear()
+        try:
+            self._shm.close()
+        except BufferError:
+            # views are still referenced, the mapping is released with them
+            logger = logging.getLogger(__name__)
+            logger.debug('views of %s are still in use', self.handle.name)
+
+        if self.owner:
+            self._shm.unlink()
+            _published.pop(self.handle.name, None)
+
+        self._shm = None
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self._arrays[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._arrays)
+
+    def __len__(self) -> int:
+        return len(self._arrays)
+
+    def __enter__(self) -> SharedArrays:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+_published: Dict[str, SharedArrays] = {}
+_attached: 'OrderedDict[str, SharedArrays]' = OrderedDict()
+
+
+class LazySharedArrays:
+    """Arrays which are published on demand, and referenced by the tasks.
+
+    Nothing is published until `refs` is first called, e.g. once a task is
+    actually submitted to a process pool, and arrays which are already shared
+    (see `SharedArrays.find`) are referenced rather than copied.  Closing
+    frees the block published by `refs`, if any.
+    """
+
+    def __init__(self, arrays: Mapping[str, np.ndarray]):
+        self.arrays = arrays
+        self._refs: Optional[Dict[str, SharedArrayRef]] = None
+        self._shared: Optional[SharedArrays] = None
+
+    def refs(self) -> Dict[str, SharedArrayRef]:
+        if self._refs is None:
+            refs = {key: SharedArrays.find(x) for key, x in self.arrays.items()}
+            arrays = {
+                key: x for key, x in self.arrays.items() if refs[key] is None
+            }
+            if arrays:
+                self._shared = SharedArrays.publish(arrays)
+                refs.update((key, (self._shared.handle, key)) for key in arrays)
+
+            self._refs = refs
+
+        return self._refs
+
+    def close(self):
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+
+    def __enter__(self) -> LazySharedArrays:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def attach_refs(refs: Mapping[str, SharedArrayRef]) -> Dict[str, np.ndarray]:
+    """Attach to the arrays of `LazySharedArrays.refs`."""
+    return {
+        name: SharedArrays.attach(handle)[key]
+        for name, (handle, key) in refs.items()
+    }
+
+
+def publish_model(model) -> SharedArrays:
+    """Publish the `ARRAYS` of a PSR or RPSR model, see `attach_model`."""
+    return SharedArrays.publish(
+        {name: getattr(model, name) for name in type(model).ARRAYS}
+    )
+
+
+def attach_model(cls, pomdp_model, handle: SharedArraysHandle):
+    """The `cls` model whose arrays are the views of a published block.
+
+    The owner process can attach too, and drop its own copy of the arrays;
+    the outcome matrix of the model is then referenced by the purges of value
+    iteration, rather than published again.
+    """
+    return cls.from_arrays(pomdp_model, SharedArrays.attach(handle))
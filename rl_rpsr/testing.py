@@ -1,7 +1,12 @@
 import random
+import types
+from typing import Optional
 
+import gym
+import numpy as np
 import numpy.random as rnd
 from rl_rpsr.core import Intent, Intents, Interaction, Test, Tests
+from rl_rpsr.pomdp import POMDP_Model
 from rl_rpsr.value_function import Alpha, ValueFunction
 
 
@@ -65,3 +70,60 @@ def random_alpha(num_actions, num_dim) -> Alpha:
 def random_value_function(num_alphas, num_actions, num_dim) -> ValueFunction:
     alphas = [random_alpha(num_actions, num_dim) for _ in range(num_alphas)]
     return ValueFunction(alphas, 0)
+
+
+class _POMDP(types.SimpleNamespace):
+    """Minimal stand-in for a `gym_pomdps.POMDP` environment."""
+
+
+def random_pomdp_model(
+    num_states,
+    num_actions,
+    num_observations,
+    rank: Optional[int] = None,
+    discount: float = 0.95,
+) -> POMDP_Model:
+    """Random POMDP model.
+
+    If `rank` is given, each state mixes the same `rank` next-state
+    distributions of each action, with weights independent of the action,
+    and the observations do not depend on the previous state, so that the
+    outcomes of all tests span at most `rank` dimensions.
+    """
+    if rank is None:
+        T = rnd.dirichlet(np.ones(num_states), size=(num_states, num_actions))
+        O = rnd.dirichlet(
+            np.ones(num_observations),
+            size=(num_states, num_actions, num_states),
+        )
+    else:
+        weights = rnd.dirichlet(np.ones(rank), size=num_states)
+        mixtures = rnd.dirichlet(np.ones(num_states), size=(num_actions, rank))
+        T = np.einsum('sk,akt->sat', weights, mixtures)
+        O = np.broadcast_to(
+            rnd.dirichlet(
+                np.ones(num_observations), size=(num_actions, num_states)
+            ),
+            (num_states, num_actions, num_states, num_observations),
+        ).copy()
+    R = rnd.randint(
+        -1, 2, size=(num_states, num_actions, num_states, num_observations)
+    ).astype(float)
+
+    env = _POMDP(
+        T=T,
+        O=O,
+        R=R,
+        start=rnd.dirichlet(np.ones(num_states)),
+        model=types.SimpleNamespace(
+            discount=discount,
+            states=list(range(num_states)),
+            actions=list(range(num_actions)),
+            observations=list(range(num_observations)),
+        ),
+        state_space=gym.spaces.Discrete(num_states),
+        action_space=gym.spaces.Discrete(num_actions),
+        observation_space=gym.spaces.Discrete(num_observations),
+        reward_range=(-1.0, 1.0),
+    )
+    return POMDP_Model(env)
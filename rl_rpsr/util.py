@@ -1,14 +1,24 @@
 import enum
-from typing import Iterator
+from typing import Iterator, Tuple
 
+import numpy as np
 from rl_rpsr.core import Interaction
 
-__all__ = ['SearchType', 'VI_Type', 'interactions']
+__all__ = [
+    'SearchType',
+    'VI_Type',
+    'interactions',
+    'discounted_returns',
+    'replay',
+    'sample_inverse_cdf',
+    'episode_seeds',
+]
 
 
 class SearchType(enum.Enum):
     BFS = enum.auto()
     DFS = enum.auto()
+    BOUNDED_DFS = enum.auto()
 
 
 class VI_Type(enum.Enum):
@@ -25,3 +35,56 @@ def interactions(action_space, observation_space) -> Iterator[Interaction]:
     for a in range(action_space.n):
         for o in range(observation_space.n):
             yield Interaction(a, o)
+
+
+def discounted_returns(rewards, discount) -> np.ndarray:
+    """Discounted returns of the rows of a (K, T) rewards array."""
+    rewards = np.asarray(rewards)
+    return rewards @ discount ** np.arange(rewards.shape[-1])
+
+
+def replay(model, actions, observations) -> np.ndarray:
+    """Return the (K, T) expected rewards of `model` along K trajectories.
+
+    `actions` and `observations` are (K, T) arrays;  the K states are
+    propagated together, one batched step at a time.
+    """
+    actions = np.asarray(actions, dtype=int)
+    observations = np.asarray(observations, dtype=int)
+
+    num_trajectories, num_steps = actions.shape
+    rewards = np.empty((num_trajectories, num_steps))
+    states = np.tile(model.start, (num_trajectories, 1))
+    for t in range(num_steps):
+        rewards[:, t] = model.expected_reward_batch(states, actions[:, t])
+        if t < num_steps - 1:
+            states = model.dynamics_batch(
+                states, actions[:, t], observations[:, t]
+            )
+
+    return rewards
+
+
+def sample_inverse_cdf(probs, u: float) -> int:
+    """Sample the index of (unnormalized) `probs`, from a uniform `u` in [0, 1).
+
+    Each sample consumes exactly one uniform, and the index is monotone in
+    `u`;  hence, runs which share their uniforms draw coupled samples.
+    """
+    cdf = np.cumsum(probs)
+    index = np.searchsorted(cdf, u * cdf[-1], side='right')
+    return min(int(index), cdf.size - 1)
+
+
+def episode_seeds(seed: int, episode: int) -> Tuple[int, int]:
+    """Environment and policy seeds of an episode, for common random numbers.
+
+    The seeds only depend on `seed` and `episode`, so that runs with different
+    environments or policies share the random stream of each episode.
+    """
+    sequence = np.random.SeedSequence(seed, spawn_key=(episode,))
+    env_sequence, policy_sequence = sequence.spawn(2)
+    return (
+        int(env_sequence.generate_state(1)[0]),
+        int(policy_sequence.generate_state(1)[0]),
+    )
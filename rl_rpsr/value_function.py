@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable, List
+from typing import Iterable, List, Optional
 
 import numpy as np
 import yaml
+from rl_rpsr.mips import MIPS_Index
 
 
 @dataclass
@@ -18,11 +19,33 @@ class Alpha(yaml.YAMLObject):
 class ValueFunction(yaml.YAMLObject):
     yaml_tag = u'!ValueFunction'
 
-    def __init__(self, alphas: Iterable[Alpha], horizon: int):
+    # bound on the value error due to approximate pruning
+    error_bound = 0.0
+
+    # number of alpha vectors from which `policy` searches an index, or None;
+    # the index only pays off for states of a few dimensions, see `MIPS_Index`,
+    # hence it is opt-in
+    index_threshold: Optional[int] = None
+
+    def __init__(
+        self, alphas: Iterable[Alpha], horizon: int, error_bound: float = 0.0
+    ):
         self.alphas = self.standardize(alphas)
         self.horizon = horizon
+        self.error_bound = error_bound
 
         self.__matrix = None
+        self.__index = None
+
+    def __getstate__(self):
+        # the index is rebuilt on demand, rather than serialized
+        state = self.__dict__.copy()
+        state['_ValueFunction__index'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault('_ValueFunction__index', None)
 
     def __len__(self):
         return len(self.alphas)
@@ -31,6 +54,22 @@ class ValueFunction(yaml.YAMLObject):
     def standardize(alphas: Iterable[Alpha]) -> List[Alpha]:
         return sorted(alphas, key=lambda alpha: alpha.vector.tolist())
 
+    def astype(self, dtype) -> ValueFunction:
+        """Copy of the value function with alpha vectors cast to `dtype`.
+
+        The value function itself is returned if no cast is needed.
+        """
+        if all(alpha.vector.dtype == dtype for alpha in self.alphas):
+            return self
+
+        alphas = [
+            Alpha(alpha.action, alpha.vector.astype(dtype))
+            for alpha in self.alphas
+        ]
+        vf = ValueFunction(alphas, self.horizon, self.error_bound)
+        vf.index_threshold = self.index_threshold
+        return vf
+
     @property
     def matrix(self):
         if self.__matrix is None:
@@ -39,9 +78,23 @@ class ValueFunction(yaml.YAMLObject):
             )
         return self.__matrix
 
+    @property
+    def index(self) -> MIPS_Index:
+        if self.__index is None:
+            self.__index = MIPS_Index(self.matrix)
+        return self.__index
+
+    def _use_index(self) -> bool:
+        return self.index_threshold is not None and (
+            len(self) >= self.index_threshold
+        )
+
     def value(self, state) -> float:
         return (self.matrix.T @ state).max()
 
     def policy(self, state) -> int:
-        idx = (self.matrix.T @ state).argmax()
+        if self._use_index():
+            idx, _ = self.index.search(state)
+        else:
+            idx = (self.matrix.T @ state).argmax()
         return self.alphas[idx].action
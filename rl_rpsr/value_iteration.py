@@ -1,14 +1,94 @@
 import abc
 import logging
+from typing import Optional
 
 import numpy as np
+from rl_rpsr.pruning import PurgeStats, WitnessStore
 from rl_rpsr.value_function import Alpha, ValueFunction
 
 
+def inc_pruning_error(
+    num_observations: int, eps: float, true_inc_pruning: bool
+) -> float:
+    """Bound on the value error of one (approximate) incremental pruning step.
+
+    The errors of the |O| purges of the S_ao sets add up in their cross-sum,
+    to which the merges of S_a and the final purge each add `eps`.
+    """
+    num_merges = num_observations - 1 if true_inc_pruning else 1
+    return (num_observations + num_merges + 1) * eps
+
+
+def sample_reachable(
+    model, num_points: int, horizon: int = 10, seed: Optional[int] = None
+) -> np.ndarray:
+    """Sample (num_points, rank) states reachable from the model start state.
+
+    Each state is reached by a uniformly random number of (at most `horizon`)
+    random actions and sampled observations.  The states are points in the
+    same space as the projected beliefs used for pruning, i.e. they can be
+    given as witness `points` to `purge`.
+    """
+    rng = np.random.default_rng(seed)
+
+    states = np.tile(model.start, (num_points, 1))
+    num_steps = rng.integers(horizon + 1, size=num_points)
+    for t in range(horizon):
+        (active,) = np.nonzero(num_steps > t)
+        if active.size == 0:
+            break
+
+        actions = rng.integers(model.action_space.n, size=active.size)
+        probs = model.observation_probs_batch(states[active], actions)
+        probs = np.clip(probs, 0.0, None)
+        probs /= probs.sum(1, keepdims=True)
+        observations = (probs.cumsum(1) < rng.random((active.size, 1))).sum(1)
+        observations = np.minimum(observations, probs.shape[1] - 1)
+
+        states[active] = model.dynamics_batch(
+            states[active], actions, observations
+        )
+
+    return states
+
+
 class VI_Algo(metaclass=abc.ABCMeta):
     def __init__(self):
         self.logger = logging.getLogger(__name__)
 
+        # witness points found while pruning, reused in later iterations
+        self.witnesses = WitnessStore()
+        # pruning statistics of the last iteration
+        self.stats = PurgeStats()
+
+    def purge_kwargs(self, **kwargs) -> dict:
+        """Start a new iteration, and return the `purge` keyword arguments."""
+        self.witnesses.step()
+        self.stats = PurgeStats()
+        return {'witnesses': self.witnesses, 'stats': self.stats, **kwargs}
+
+    def prune_error(  # pylint: disable=no-self-use,unused-argument
+        self, model, eps: float = 0.0, dedup_tol: float = 0.0, **kwargs
+    ) -> float:
+        """Bound on the value error introduced by the pruning of one iteration.
+
+        Each purge drops vectors which improve the envelope by at most `eps`,
+        and near-duplicates within `dedup_tol`, so it loses at most
+        `eps + dedup_tol` value at any state.
+        """
+        return eps + dedup_tol
+
+    def error_bound(self, model, vf: ValueFunction, **kwargs) -> float:
+        """Bound on the value error of the iterate which follows `vf`.
+
+        The error of the previous iterate is contracted by the discount, and
+        the pruning error of the current iteration is added;  over many
+        iterations, the bound converges to `prune_error / (1 - discount)`.
+        """
+        return model.discount * vf.error_bound + self.prune_error(
+            model, **kwargs
+        )
+
     @staticmethod
     def init(model) -> ValueFunction:
         return ValueFunction([Alpha(-1, np.zeros(model.rank))], 0)
@@ -4,6 +4,7 @@ import logging
 
 from rl_rpsr import psr, rpsr
 from rl_rpsr.pomdp import POMDP_Model
+from rl_rpsr.search import joint_searcher_factory
 from rl_rpsr.serializer import CoreSerializer
 from rl_rpsr.util import SearchType
 
@@ -18,15 +19,34 @@ def main_search(args):
     print(f'|S|={pomdp_model.state_space.n}', end=' ')
 
     if args.model == 'psr':
-        searcher = psr.searcher_factory(args.search_type)
+        searcher = psr.searcher_factory(
+            args.search_type, args.max_depth, args.max_nodes
+        )
         core = searcher.search(pomdp_model)
         print(f'|Q|={len(core)}')
 
     elif args.model == 'rpsr':
-        searcher = rpsr.searcher_factory(args.search_type)
+        searcher = rpsr.searcher_factory(
+            args.search_type, args.max_depth, args.max_nodes
+        )
         core = searcher.search(pomdp_model)
         print(f'|I|={len(core)}')
 
+    elif args.model == 'joint':
+        searcher = joint_searcher_factory(
+            args.search_type, args.max_depth, args.max_nodes
+        )
+        core_psr, core_rpsr = searcher.search(pomdp_model)
+        print(f'|Q|={len(core_psr)} |I|={len(core_rpsr)}')
+
+        if args.save_core_psr is not None:
+            CoreSerializer().dump(args.save_core_psr, core_psr)
+
+        if args.save_core_rpsr is not None:
+            CoreSerializer().dump(args.save_core_rpsr, core_rpsr)
+
+        return
+
     if args.save_core is not None:
         CoreSerializer().dump(args.save_core, core)
 
@@ -34,14 +54,18 @@ def main_search(args):
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('pomdp')
-    parser.add_argument('model', choices=['psr', 'rpsr'])
+    parser.add_argument('model', choices=['psr', 'rpsr', 'joint'])
     parser.add_argument('--save-core', default=None)
+    parser.add_argument('--save-core-psr', default=None)
+    parser.add_argument('--save-core-rpsr', default=None)
     parser.add_argument(
         '--search-type',
         type=SearchType.__getitem__,
         choices=SearchType.__members__.values(),
         default='BFS',
     )
+    parser.add_argument('--max-depth', type=int, default=None)
+    parser.add_argument('--max-nodes', type=int, default=None)
 
     parser.add_argument('--log-filename', default=None)
     parser.add_argument(
@@ -52,6 +76,12 @@ def main():
 
     args = parser.parse_args()
 
+    if args.model == 'joint' and args.save_core is not None:
+        parser.error(
+            'argument --save-core: not allowed with the joint model (use '
+            '--save-core-psr and --save-core-rpsr)'
+        )
+
     if args.log_filename is not None:
         logging.basicConfig(
             filename=args.log_filename,
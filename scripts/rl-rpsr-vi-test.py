@@ -4,6 +4,7 @@ import logging
 
 import numpy as np
 from rl_rpsr import bsr, pomdp, psr, rpsr
+from rl_rpsr.model_cache import make_model
 from rl_rpsr.serializer import IntentsSerializer, TestsSerializer, VF_Serializer
 
 
@@ -18,11 +19,15 @@ def main_test(args):
 
     if args.load_core_psr is not None:
         Q = TestsSerializer().load(args.load_core_psr)
-        models['psr'] = psr.PSR_Model(pomdp_model, Q)
+        models['psr'] = make_model(
+            psr.PSR_Model, pomdp_model, Q, args.model_cache
+        )
 
     if args.load_core_rpsr is not None:
         I = IntentsSerializer().load(args.load_core_rpsr)
-        models['rpsr'] = rpsr.RPSR_Model(pomdp_model, I)
+        models['rpsr'] = make_model(
+            rpsr.RPSR_Model, pomdp_model, I, args.model_cache
+        )
 
     serializer = VF_Serializer()
 
@@ -68,6 +73,7 @@ def main():
 
     parser.add_argument('--load-core-psr', default=None)
     parser.add_argument('--load-core-rpsr', default=None)
+    parser.add_argument('--model-cache', default=None)
     parser.add_argument('--load-vf-bsr', default=None)
     parser.add_argument('--load-vf-psr', default=None)
     parser.add_argument('--load-vf-rpsr', default=None)
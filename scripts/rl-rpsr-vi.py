@@ -1,17 +1,23 @@
 #!/usr/bin/env python
 import argparse
+import contextlib
 import logging
+from concurrent.futures import ProcessPoolExecutor
 
 from rl_rpsr import bsr, psr, rpsr
 from rl_rpsr.metrics import VF_Metric
+from rl_rpsr.model_cache import make_model
 from rl_rpsr.pomdp import POMDP_Model
+from rl_rpsr.pruning import LP_BACKENDS, PURGE_BACKENDS
 from rl_rpsr.serializer import (
     AlphaSerializer,
     IntentsSerializer,
     TestsSerializer,
     VF_Serializer,
 )
+from rl_rpsr.shared import attach_model, publish_model
 from rl_rpsr.util import VI_Type
+from rl_rpsr.value_iteration import sample_reachable
 
 
 def main_vi(args):
@@ -26,12 +32,12 @@ def main_vi(args):
 
     elif args.model == 'psr':
         Q = TestsSerializer().load(args.load_core)
-        model = psr.PSR_Model(pomdp_model, Q)
+        model = make_model(psr.PSR_Model, pomdp_model, Q, args.model_cache)
         vi_algo = psr.vi_factory(args.vi_type)
 
     elif args.model == 'rpsr':
         I = IntentsSerializer().load(args.load_core)
-        model = rpsr.RPSR_Model(pomdp_model, I)
+        model = make_model(rpsr.RPSR_Model, pomdp_model, I, args.model_cache)
         vi_algo = rpsr.vi_factory(args.vi_type)
 
     vf = None
@@ -51,33 +57,79 @@ def main_vi(args):
 
     metric = VF_Metric.factory(args.metric, start=model.start)
 
-    eps = 1e-15
-
-    logger.info('VI START')
-    for _ in range(args.horizon):
-        vf_prev, vf = vf, vi_algo.iterate(model, vf, eps=eps)
+    # the dominance LPs are solved up to a numeric tolerance;  pruning is
+    # approximate only if the user asks for looser tolerances
+    eps = max(args.eps, 1e-15)
+    dedup_tol = args.dedup_tol
+    approximate = args.eps + dedup_tol > 0.0
+    if approximate and model.discount < 1.0:
+        prune_error = vi_algo.prune_error(model, eps=eps, dedup_tol=dedup_tol)
         logger.info(
-            'VI iter horizon %d -> %d num_alphas %d -> %d',
-            vf_prev.horizon,
-            vf.horizon,
-            len(vf_prev),
-            len(vf),
+            'approximate pruning with eps %g dedup tol %g, '
+            'asymptotic error bound %g',
+            eps,
+            dedup_tol,
+            prune_error / (1.0 - model.discount),
         )
 
-        distance = metric.distance(vf_prev, vf)
-        logger.info('VI iter distance %f', distance)
-
-        if args.save_vf is not None:
-            filename = f'{args.load_vf}.{vf.horizon}'
-            logger.info('saving vf to %s', filename)
-            vf_serializer.dump(filename, vf)
-
-        if args.save_alpha is not None:
-            filename = f'{args.save_alpha}.{vf.horizon}'
-            logger.info('saving alphas to %s', filename)
-            alpha_serializer.dump(filename, vf)
-
-    logger.info('VI STOP')
+    # reachable states seed the witness screening of the pruning
+    points = None
+    if args.num_reachable > 0:
+        points = sample_reachable(model, args.num_reachable, seed=0)
+
+    purge_kwargs = {
+        'eps': eps,
+        'dedup_tol': dedup_tol,
+        'points': points,
+        'backend': args.purge_backend,
+        'shard_size': args.shard_size,
+        'lp_backend': args.lp_backend,
+    }
+
+    # LPs of the same purge are solved in parallel by a pool of workers, which
+    # attach to the published outcome matrix instead of receiving copies;  the
+    # workers are shut down before the shared memory is released
+    with contextlib.ExitStack() as stack:
+        if args.num_workers > 1:
+            if args.model != 'bsr':
+                shared_model = stack.enter_context(publish_model(model))
+                model = attach_model(
+                    type(model), pomdp_model, shared_model.handle
+                )
+
+            executor = stack.enter_context(
+                ProcessPoolExecutor(args.num_workers)
+            )
+            purge_kwargs.update(executor=executor, batch_size=args.num_workers)
+
+        logger.info('VI START')
+        for _ in range(args.horizon):
+            vf_prev, vf = vf, vi_algo.iterate(model, vf, **purge_kwargs)
+            logger.info(
+                'VI iter horizon %d -> %d num_alphas %d -> %d',
+                vf_prev.horizon,
+                vf.horizon,
+                len(vf_prev),
+                len(vf),
+            )
+
+            distance = metric.distance(vf_prev, vf)
+            logger.info('VI iter distance %f', distance)
+            if approximate:
+                logger.info('VI iter error bound %g', vf.error_bound)
+            logger.info('VI iter pruning %s', vi_algo.stats)
+
+            if args.save_vf is not None:
+                filename = f'{args.load_vf}.{vf.horizon}'
+                logger.info('saving vf to %s', filename)
+                vf_serializer.dump(filename, vf)
+
+            if args.save_alpha is not None:
+                filename = f'{args.save_alpha}.{vf.horizon}'
+                logger.info('saving alphas to %s', filename)
+                alpha_serializer.dump(filename, vf)
+
+        logger.info('VI STOP')
 
     if args.save_vf is not None:
         logger.info('saving vf to %s', args.save_vf)
@@ -93,11 +145,23 @@ def main():
     parser.add_argument('pomdp')
     parser.add_argument('model', choices=['bsr', 'psr', 'rpsr'])
     parser.add_argument('--load-core', default=None)
+    parser.add_argument('--model-cache', default=None)
     parser.add_argument('--load-vf', default=None)
     parser.add_argument('--save-vf', default=None)
     parser.add_argument('--save-alpha', default=None)
     parser.add_argument('--disable-pbar', action='store_true')
     parser.add_argument('--horizon', type=int, default=20)
+    parser.add_argument('--num-reachable', type=int, default=100)
+    parser.add_argument('--eps', type=float, default=0.0)
+    parser.add_argument('--dedup-tol', type=float, default=0.0)
+    parser.add_argument('--num-workers', type=int, default=1)
+    parser.add_argument('--shard-size', type=int, default=None)
+    parser.add_argument(
+        '--lp-backend', choices=list(LP_BACKENDS), default='cvxpy'
+    )
+    parser.add_argument(
+        '--purge-backend', choices=PURGE_BACKENDS, default='auto'
+    )
     parser.add_argument(
         '--metric', choices=['alpha', 'bellman-at-start'], default=None
     )
@@ -122,6 +186,24 @@ def main():
             'The --load-core option is required iff the model is `bsr`'
         )
 
+    if args.eps < 0.0:
+        parser.error(f'The --eps option must be non-negative ({args.eps})')
+
+    if args.dedup_tol < 0.0:
+        parser.error(
+            f'The --dedup-tol option must be non-negative ({args.dedup_tol})'
+        )
+
+    if args.num_workers < 1:
+        parser.error(
+            f'The --num-workers option must be positive ({args.num_workers})'
+        )
+
+    if args.shard_size is not None and args.shard_size < 2:
+        parser.error(
+            f'The --shard-size option must be at least 2 ({args.shard_size})'
+        )
+
     if args.log_filename is not None:
         logging.basicConfig(
             filename=args.log_filename,
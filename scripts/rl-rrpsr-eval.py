@@ -1,12 +1,20 @@
 #!/usr/bin/env python
 import argparse
+import contextlib
 import logging
+import os
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, Iterator, List
 
+import numpy as np
 from rl_rpsr import bsr, pomdp, psr, rpsr
-from rl_rpsr.policy import ModelPolicy, Policy, RandomPolicy
+from rl_rpsr.controller import ControllerPolicy, FiniteStateController
+from rl_rpsr.model_cache import make_model
+from rl_rpsr.policy import CheckedPolicy, ModelPolicy, Policy, RandomPolicy
+from rl_rpsr.results import ResultsWriter
 from rl_rpsr.serializer import IntentsSerializer, TestsSerializer, VF_Serializer
+from rl_rpsr.util import discounted_returns, episode_seeds, replay
+from rl_rpsr.value_iteration import sample_reachable
 
 
 def make_policy(models, pomdp_model, args) -> Policy:
@@ -22,20 +30,37 @@ def make_policy(models, pomdp_model, args) -> Policy:
             vf = serializer.load(args.load_vf_psr)
         elif args.policy == 'rpsr':
             vf = serializer.load(args.load_vf_rpsr)
+        vf.index_threshold = args.index_threshold
 
         model = models[args.policy]
-        policy = ModelPolicy(model, vf)
-
-    return policy
-
+        if args.controller or args.exact is not None:
+            points = sample_reachable(model, args.controller_points)
+            controller = FiniteStateController.extract(model, vf, points)
+            policy = ControllerPolicy(controller)
+
+            if args.check_controller:
+                reference = ModelPolicy(
+                    model, vf, projection_period=args.projection_period
+                )
+                policy = CheckedPolicy(policy, reference)
+
+            return policy
+
+        dtype = np.dtype(args.precision)
+        policy = ModelPolicy(
+            model.astype(dtype),
+            vf.astype(dtype),
+            projection_period=args.projection_period,
+            normalization_period=args.normalization_period,
+        )
 
-def return_(rewards, discount):
-    G, d = 0.0, 1.0
-    for r in rewards:
-        G += r * d
-        d *= discount
+        if args.check_precision:
+            reference = ModelPolicy(
+                model, vf, projection_period=args.projection_period
+            )
+            policy = CheckedPolicy(policy, reference)
 
-    return G
+    return policy
 
 
 @dataclass
@@ -78,15 +103,69 @@ def simulate(
     return sim
 
 
-def model_rewards(model, actions, observations):
-    rewards = []
+def simulated_returns(models, env, policy, args) -> Iterator[Dict[str, float]]:
+    """Generator of the returns of each simulation, replayed by each model.
+
+    Simulations are replayed in chunks of `args.chunk_size` trajectories, one
+    batched `replay` per model and chunk, and their returns are then yielded
+    one simulation at a time.
+    """
+    logger = logging.getLogger(__name__)
+
+    logger.info('pomdp %s env %s policy %s', args.pomdp, args.env, args.policy)
+    for start in range(0, args.num_simulations, args.chunk_size):
+        sims = []
+        for i in range(
+            start, min(start + args.chunk_size, args.num_simulations)
+        ):
+            logger.info('simulation %d / %d', i, args.num_simulations)
+            if args.seed is not None:
+                # common random numbers, shared by every env and policy
+                env_seed, policy_seed = episode_seeds(args.seed, i)
+                env.seed(env_seed)
+                policy.seed(policy_seed)
+
+            sims.append(simulate(env, policy, num_steps=args.num_steps))
+
+        # (K, T) trajectories of the chunk
+        actions = np.array([sim.actions for sim in sims], dtype=int)
+        observations = np.array([sim.observations for sim in sims], dtype=int)
+        actions = actions.reshape(len(sims), -1)
+        observations = observations.reshape(len(sims), -1)
+        returns = {
+            key: discounted_returns(
+                replay(model, actions, observations), env.discount
+            )
+            for key, model in models.items()
+        }
+
+        for k in range(len(sims)):
+            yield {key: returns[key][k].item() for key in models}
+
+    if isinstance(policy, CheckedPolicy):
+        logger.info('reference action agreement %f', policy.agreement)
+
+
+def exact_returns(models, controller, args) -> Iterator[Dict[str, float]]:
+    """Expected returns of the controller, one per model, without sampling.
+
+    The finite horizon matches the `num_steps - 1` rewards of a simulation.
+    """
+    logger = logging.getLogger(__name__)
 
-    state = model.start.copy()
-    for action, observation in zip(actions, observations):
-        rewards.append(model.expected_reward(state, action))
-        state = model.dynamics(state, action, observation)
+    if controller.disagreements():
+        logger.warning(
+            'controller disagrees with the %s vf policy, its exact returns may '
+            'differ from those of the vf policy',
+            args.policy,
+        )
 
-    return rewards
+    horizon = None if args.exact == 'infinite' else args.num_steps - 1
+    logger.info('exact evaluation with horizon %s', horizon)
+    yield {
+        key: controller.evaluate(model, horizon)
+        for key, model in models.items()
+    }
 
 
 def main_eval(args):
@@ -100,33 +179,62 @@ def main_eval(args):
 
     if args.load_core_psr is not None:
         Q = TestsSerializer().load(args.load_core_psr)
-        models['psr'] = psr.PSR_Model(pomdp_model, Q)
+        models['psr'] = make_model(
+            psr.PSR_Model, pomdp_model, Q, args.model_cache
+        )
 
     if args.load_core_rpsr is not None:
         I = IntentsSerializer().load(args.load_core_rpsr)
-        models['rpsr'] = rpsr.RPSR_Model(pomdp_model, I)
+        models['rpsr'] = make_model(
+            rpsr.RPSR_Model, pomdp_model, I, args.model_cache
+        )
 
+    # the env and the policy run in the given precision, while the returns
+    # are replayed in float64
+    env_kwargs = dict(
+        projection_period=args.projection_period,
+        normalization_period=args.normalization_period,
+    )
+    env_model = models[args.env].astype(np.dtype(args.precision))
     if args.env == 'bsr':
-        env = bsr.BSR(models['bsr'])
+        env = bsr.BSR(env_model, **env_kwargs)
 
     elif args.env == 'psr':
-        env = psr.PSR(models['psr'])
+        env = psr.PSR(env_model, **env_kwargs)
 
     elif args.env == 'rpsr':
-        env = rpsr.RPSR(models['rpsr'])
+        env = rpsr.RPSR(env_model, **env_kwargs)
 
     policy = make_policy(models, pomdp_model, args)
 
-    logger.info('pomdp %s env %s policy %s', args.pomdp, args.env, args.policy)
-    for i in range(args.num_simulations):
-        logger.info('simulation %d / %d', i, args.num_simulations)
-        sim = simulate(env, policy, num_steps=args.num_steps)
+    if args.exact is not None:
+        returns = exact_returns(models, policy.controller, args)
 
-        for key, model in models.items():
-            rewards = model_rewards(model, sim.actions, sim.observations)
-            s = f'{args.env} {args.policy} {key} {return_(rewards, env.discount)}'
-            logger.info(s)
-            print(s)
+    else:
+        returns = simulated_returns(models, env, policy, args)
+
+    # results are printed and saved as each simulation finishes
+    pomdp_name = os.path.basename(args.pomdp)
+    with contextlib.ExitStack() as stack:
+        writer = None
+        if args.save_results is not None:
+            logger.info('saving results to %s', args.save_results)
+            writer = stack.enter_context(
+                ResultsWriter(
+                    args.save_results,
+                    ['bsr', 'psr', 'rpsr'],
+                    chunk_size=args.chunk_size,
+                )
+            )
+
+        for i, returns_i in enumerate(returns):
+            for key, return_ in returns_i.items():
+                s = f'{args.env} {args.policy} {key} {return_}'
+                logger.info(s)
+                print(s, flush=True)
+
+            if writer is not None:
+                writer.write(pomdp_name, args.env, args.policy, i, returns_i)
 
 
 def main():
@@ -139,11 +247,38 @@ def main():
 
     parser.add_argument('--load-core-psr', default=None)
     parser.add_argument('--load-core-rpsr', default=None)
+    parser.add_argument('--model-cache', default=None)
     parser.add_argument('--load-vf-bsr', default=None)
     parser.add_argument('--load-vf-psr', default=None)
     parser.add_argument('--load-vf-rpsr', default=None)
     parser.add_argument('--num-steps', type=int, default=1000)
     parser.add_argument('--num-simulations', type=int, default=1)
+    parser.add_argument('--projection-period', type=int, default=None)
+    parser.add_argument(
+        '--index-threshold',
+        type=int,
+        default=None,
+        help='number of alpha vectors from which the policy searches an index',
+    )
+    parser.add_argument(
+        '--precision', choices=['float64', 'float32'], default='float64'
+    )
+    parser.add_argument('--normalization-period', type=int, default=None)
+    parser.add_argument('--check-precision', action='store_true')
+    parser.add_argument('--controller', action='store_true')
+    parser.add_argument('--controller-points', type=int, default=1_000)
+    parser.add_argument('--check-controller', action='store_true')
+    parser.add_argument(
+        '--exact', nargs='?', choices=['finite', 'infinite'], const='finite'
+    )
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--save-results', default=None)
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=1_000,
+        help='number of simulations replayed and saved together',
+    )
 
     parser.add_argument('--log-filename', default=None)
     parser.add_argument(
@@ -189,6 +324,32 @@ def main():
             'argument --policy: invalid choice: \'rpsr\' (rpsr vf not loaded)'
         )
 
+    if args.index_threshold is not None and args.index_threshold < 1:
+        parser.error(
+            'argument --index-threshold: invalid value '
+            f'{args.index_threshold} (must be positive)'
+        )
+
+    if args.chunk_size < 1:
+        parser.error(
+            f'argument --chunk-size: invalid value {args.chunk_size} (must be '
+            'positive)'
+        )
+
+    if args.controller and args.policy == 'random':
+        parser.error(
+            'argument --controller: requires a bsr, psr or rpsr policy'
+        )
+
+    if args.exact is not None and args.policy == 'random':
+        parser.error('argument --exact: requires a bsr, psr or rpsr policy')
+
+    if args.exact is not None and args.check_controller:
+        parser.error('argument --exact: not allowed with --check-controller')
+
+    if args.check_controller and not args.controller:
+        parser.error('argument --check-controller: requires --controller')
+
     if args.log_filename is not None:
         logging.basicConfig(
             filename=args.log_filename,
@@ -5,6 +5,7 @@ import logging
 import numpy as np
 import pandas as pd
 from rl_rpsr import psr, rpsr
+from rl_rpsr.model_cache import make_model
 from rl_rpsr.pomdp import POMDP_Model
 from rl_rpsr.serializer import IntentsSerializer, TestsSerializer
 
@@ -18,11 +19,11 @@ def main_info(args):
 
     if args.model == 'psr':
         Q = TestsSerializer().load(args.load_core)
-        model = psr.PSR_Model(pomdp_model, Q)
+        model = make_model(psr.PSR_Model, pomdp_model, Q, args.model_cache)
 
     elif args.model == 'rpsr':
         I = IntentsSerializer().load(args.load_core)
-        model = rpsr.RPSR_Model(pomdp_model, I)
+        model = make_model(rpsr.RPSR_Model, pomdp_model, I, args.model_cache)
 
     model_R = model.R_as_pomdp()
 
@@ -58,6 +59,7 @@ def main():
     parser.add_argument('pomdp')
     parser.add_argument('model', choices=['psr', 'rpsr'])
     parser.add_argument('--load-core', required=True)
+    parser.add_argument('--model-cache', default=None)
     parser.add_argument('--outcome', action='store_true')
     parser.add_argument('--stats', action='store_true')
     parser.add_argument('--comparison', action='store_true')
@@ -0,0 +1,168 @@
+import types
+import unittest
+
+import numpy as np
+import numpy.random as rnd
+from rl_rpsr.controller import ControllerPolicy, FiniteStateController
+from rl_rpsr.policy import CheckedPolicy, ModelPolicy
+from rl_rpsr.value_function import Alpha, ValueFunction
+
+
+class BeliefModel:
+    """Minimal belief model, from (|A|, |S|, |S|) `T` and (|A|, |S|, |O|) `O`."""
+
+    def __init__(self, T, O, start, R=None, discount=0.9):
+        self.T = T
+        self.O = O
+        self.start = start
+        self.R = np.zeros((T.shape[1], T.shape[0])) if R is None else R
+        self.discount = discount
+
+        self.rank = T.shape[1]
+        self.transitions = np.einsum('aij,ajo->aoij', T, O)
+
+        self.action_space = types.SimpleNamespace(n=T.shape[0])
+        self.observation_space = types.SimpleNamespace(n=O.shape[2])
+
+    def dynamics(self, state, action, observation):
+        state = (state @ self.T[action]) * self.O[action, :, observation]
+        return state / state.sum()
+
+    def observation_probs_batch(self, states, actions):
+        return np.einsum(
+            'ki,kij,kjo->ko', states, self.T[actions], self.O[actions]
+        )
+
+    def dynamics_batch(self, states, actions, observations):
+        next_states = np.einsum('ki,kij->kj', states, self.T[actions])
+        next_states *= self.O[actions, :, observations]
+        return next_states / next_states.sum(1, keepdims=True)
+
+
+def run(policy, model, num_steps):
+    state = rnd.choice(2, p=model.start)
+    action = policy.reset()
+    for _ in range(num_steps):
+        state = rnd.choice(2, p=model.T[action, state])
+        observation = rnd.choice(2, p=model.O[action, state])
+        action = policy.step(action, observation)
+
+
+class TestFiniteStateController(unittest.TestCase):
+    def test_observable(self):
+        # observations reveal the state, so the last one determines the alpha
+        T = np.full((2, 2, 2), 0.5)
+        O = np.stack([np.eye(2), np.eye(2)])
+        model = BeliefModel(T, O, np.array([0.5, 0.5]))
+        vf = ValueFunction(
+            [Alpha(0, np.array([1.0, 0.0])), Alpha(1, np.array([0.0, 1.0]))],
+            1,
+        )
+
+        controller = FiniteStateController.extract(model, vf)
+
+        self.assertEqual(len(controller), 2)
+        self.assertListEqual(controller.disagreements(), [])
+        for node in range(len(controller)):
+            for observation in range(2):
+                successor = controller.successors[node, observation]
+                self.assertEqual(controller.actions[successor], observation)
+
+        policy = CheckedPolicy(
+            ControllerPolicy(controller), ModelPolicy(model, vf)
+        )
+        run(policy, model, 100)
+        self.assertEqual(policy.agreement, 1.0)
+
+    def test_disagreements(self):
+        # noisy observations, so the successor depends on the whole history
+        T = np.array([[[0.9, 0.1], [0.1, 0.9]]] * 2)
+        O = np.array([[[0.7, 0.3], [0.3, 0.7]]] * 2)
+        model = BeliefModel(T, O, np.array([0.5, 0.5]))
+        vf = ValueFunction(
+            [
+                Alpha(0, np.array([1.0, 0.0])),
+                Alpha(1, np.array([0.0, 1.0])),
+                Alpha(0, np.array([0.6, 0.6])),
+            ],
+            1,
+        )
+        points = rnd.dirichlet(np.ones(2), size=200)
+
+        controller = FiniteStateController.extract(model, vf, points)
+        disagreements = controller.disagreements()
+
+        self.assertGreater(len(disagreements), 0)
+        agreements = [agreement for _, _, agreement in disagreements]
+        self.assertListEqual(agreements, sorted(agreements))
+        for node, observation, agreement in disagreements:
+            self.assertLess(agreement, 1.0)
+            self.assertGreater(agreement, 0.0)
+            self.assertLess(node, len(controller))
+
+        self.assertListEqual(controller.disagreements(tol=1.0), [])
+
+    def test_evaluate(self):
+        T = rnd.dirichlet(np.ones(3), size=(2, 3))
+        O = rnd.dirichlet(np.ones(2), size=(2, 3))
+        R = rnd.randn(3, 2)
+        model = BeliefModel(T, O, rnd.dirichlet(np.ones(3)), R)
+
+        # a single node always takes action 1
+        controller = FiniteStateController(
+            np.array([0]), np.array([1]), np.zeros((1, 2), int), np.ones((1, 2))
+        )
+
+        w = np.linalg.solve(np.eye(3) - model.discount * T[1], R[:, 1])
+        self.assertAlmostEqual(controller.evaluate(model), model.start @ w)
+
+        self.assertEqual(controller.evaluate(model, 0), 0.0)
+        self.assertAlmostEqual(
+            controller.evaluate(model, 1), model.start @ R[:, 1]
+        )
+        self.assertAlmostEqual(
+            controller.evaluate(model, 500), controller.evaluate(model)
+        )
+
+    def test_evaluate_nodes(self):
+        # alternates actions 0 and 1, regardless of the observations
+        T = rnd.dirichlet(np.ones(3), size=(2, 3))
+        O = rnd.dirichlet(np.ones(2), size=(2, 3))
+        R = rnd.randn(3, 2)
+        model = BeliefModel(T, O, rnd.dirichlet(np.ones(3)), R)
+        controller = FiniteStateController(
+            np.array([0, 1]),
+            np.array([0, 1]),
+            np.array([[1, 1], [0, 0]]),
+            np.ones((2, 2)),
+        )
+
+        ret = 0.0
+        belief = model.start
+        for t in range(4):
+            action = t % 2
+            ret += model.discount**t * belief @ R[:, action]
+            belief = belief @ T[action]
+
+        self.assertAlmostEqual(controller.evaluate(model, 4), ret)
+
+
+class TestControllerPolicy(unittest.TestCase):
+    def test_lookup(self):
+        controller = FiniteStateController(
+            np.array([0, 1]),
+            np.array([1, 0]),
+            np.array([[0, 1], [1, 0]]),
+            np.ones((2, 2)),
+        )
+        policy = ControllerPolicy(controller)
+
+        self.assertEqual(policy.reset(), 1)
+        self.assertEqual(policy.step(1, 1), 0)
+        self.assertEqual(policy.step(0, 1), 1)
+        self.assertEqual(policy.step(1, 0), 1)
+        self.assertEqual(policy.reset(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
+import pickle
 import unittest
 
 import rl_rpsr.testing as testing
-from rl_rpsr.core import Intent, Test
+import yaml
+from rl_rpsr.core import Intent, Intents, Test
 
 
 class TestInteraction(unittest.TestCase):
@@ -34,6 +36,26 @@ class TestTest(unittest.TestCase):
         self.assertEqual(len(test_prepended), len(test) + 1)
         self.assertEqual(test_prepended.interactions[0], interaction)
         self.assertEqual(test_prepended.interactions[1:], test.interactions)
+        self.assertIs(test_prepended.tail, test)
+
+    def test_interned(self):
+        test = testing.random_test(10, 10, 10)
+
+        self.assertIs(Test(test.interactions), test)
+        self.assertIs(Test(()), Test.empty())
+        self.assertIs(pickle.loads(pickle.dumps(test)), test)
+        self.assertEqual(hash(Test(list(test))), hash(test))
+
+    def test_yaml(self):
+        test = testing.random_test(10, 10, 10)
+        intents = Intents((Intent(test, 0), Intent(test.prepend(test.head), 1)))
+
+        text = yaml.dump(intents)
+        self.assertIn('!Test', text)
+
+        intents_loaded = yaml.load(text, Loader=yaml.Loader)
+        self.assertEqual(intents_loaded, intents)
+        self.assertIs(intents_loaded.intents[0].test, test)
 
 
 class TestIntent(unittest.TestCase):
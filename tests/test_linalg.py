@@ -1,7 +1,9 @@
 import unittest
 
 import numpy as np
+import numpy.random as rnd
 from rl_rpsr.linalg import (
+    grouped_vecmat,
     linearly_independent_lstsq,
     linearly_independent_pinv,
     linearly_independent_rank,
@@ -43,5 +45,25 @@ class TestLinearlyIndependent(unittest.TestCase):
         self.assertFalse(linearly_independent_lstsq(vectors[:-1], vector))
 
 
+class TestGroupedVecmat(unittest.TestCase):
+    def test_grouped_vecmat(self):
+        num_vectors, num_actions, num_observations, num_dim = 20, 3, 2, 4
+        vectors = rnd.randn(num_vectors, num_dim)
+        matrices = rnd.randn(num_actions, num_observations, num_dim, num_dim)
+        actions = rnd.randint(num_actions, size=num_vectors)
+        observations = rnd.randint(num_observations, size=num_vectors)
+
+        result = grouped_vecmat(vectors, matrices, actions, observations)
+        target = np.stack(
+            [
+                vector @ matrices[action, observation]
+                for vector, action, observation in zip(
+                    vectors, actions, observations
+                )
+            ]
+        )
+        np.testing.assert_allclose(result, target)
+
+
 if __name__ == '__main__':
     unittest.main()
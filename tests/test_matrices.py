@@ -0,0 +1,59 @@
+import gc
+import unittest
+
+import numpy as np
+import numpy.random as rnd
+from rl_rpsr import matrices
+
+
+class Env:
+    def __init__(self, num_states, num_actions, num_observations):
+        S, A, O = num_states, num_actions, num_observations
+        self.T = rnd.dirichlet(np.ones(S), size=(S, A))
+        self.O = rnd.dirichlet(np.ones(O), size=(S, A, S))
+        self.R = rnd.randn(S, A, S, O)
+
+
+class TestMatrices(unittest.TestCase):
+    def test_shapes(self):
+        env = Env(3, 2, 4)
+
+        self.assertTupleEqual(matrices.R(env).shape, (3, 2))
+        self.assertTupleEqual(matrices.G(env).shape, (2, 4, 3, 3))
+        self.assertTupleEqual(matrices.D(env).shape, (2, 4, 3, 3))
+
+        np.testing.assert_allclose(matrices.G(env).sum((1, 2)), 1.0)
+
+    def test_cached(self):
+        env = Env(3, 2, 4)
+        self.assertIs(matrices.G(env), matrices.G(env))
+
+    def test_discard(self):
+        env = Env(3, 2, 4)
+        G = matrices.G(env)
+        matrices.G.cache_discard(env)
+        self.assertIsNot(matrices.G(env), G)
+
+    def test_weak(self):
+        matrices.G.cache_clear()
+
+        env = Env(3, 2, 4)
+        matrices.G(env)
+        self.assertEqual(len(matrices.G), 1)
+
+        del env
+        gc.collect()
+        self.assertEqual(len(matrices.G), 0)
+
+    def test_bounded(self):
+        matrices.G.cache_clear()
+
+        envs = [Env(3, 2, 4) for _ in range(2 * matrices.G.maxsize)]
+        for env in envs:
+            matrices.G(env)
+
+        self.assertEqual(len(matrices.G), matrices.G.maxsize)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import numpy.random as rnd
+from rl_rpsr.mips import MIPS_Index
+from rl_rpsr.value_function import Alpha, ValueFunction
+
+
+class TestMIPS_Index(unittest.TestCase):
+    def test_search(self):
+        for dim in [1, 3, 10]:
+            matrix = rnd.randn(dim, 1_000)
+            index = MIPS_Index(matrix, leaf_size=16, max_fraction=1.0)
+
+            for x in rnd.randn(50, dim):
+                values = matrix.T @ x
+                i, value = index.search(x)
+                self.assertEqual(i, values.argmax())
+                self.assertAlmostEqual(value, values.max())
+
+    def test_pruning(self):
+        # one dominant coordinate, so that most leaves are pruned
+        matrix = rnd.randn(2, 1_000) * np.array([[100.0], [1.0]])
+        index = MIPS_Index(matrix, leaf_size=16, max_fraction=1.0)
+
+        for x in [np.array([1.0, 0.1]), np.array([-1.0, 0.1])]:
+            i, _ = index.search(x)
+            self.assertEqual(i, (matrix.T @ x).argmax())
+
+    def test_ties(self):
+        vectors = rnd.randn(3, 20)
+        # every column three times
+        matrix = np.column_stack([vectors, vectors, vectors])
+        index = MIPS_Index(matrix, leaf_size=4, max_fraction=1.0)
+
+        for x in rnd.randn(20, 3):
+            i, _ = index.search(x)
+            self.assertEqual(i, (vectors.T @ x).argmax())
+
+    def test_near_ties(self):
+        # values 1 ulp apart are not ties
+        matrix = np.array([[1.0, np.nextafter(1.0, 2.0), 1.0], [0.0, 0.0, 0.0]])
+        matrix = np.repeat(matrix, 10, axis=1)
+        index = MIPS_Index(matrix, leaf_size=4, max_fraction=1.0)
+
+        i, _ = index.search(np.array([1.0, 0.0]))
+        self.assertEqual(i, 10)
+
+    def test_brute_force(self):
+        # columns a few ulps apart, which rounding may order either way
+        vectors = rnd.randn(5, 100)
+        matrix = np.column_stack(
+            [vectors]
+            + [
+                vectors
+                + rnd.randint(-3, 4, vectors.shape) * np.spacing(vectors)
+                for _ in range(4)
+            ]
+        )
+        matrix = matrix[:, rnd.permutation(matrix.shape[1])]
+        index = MIPS_Index(matrix, leaf_size=4, max_fraction=1.0)
+
+        for x in rnd.randn(100, 5):
+            i, _ = index.search(x)
+            self.assertEqual(i, (matrix.T @ x).argmax())
+
+    def test_constant(self):
+        index = MIPS_Index(np.ones((4, 100)), leaf_size=8)
+
+        i, _ = index.search(rnd.randn(4))
+        self.assertEqual(i, 0)
+        self.assertEqual(len(index), 100)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            MIPS_Index(np.empty((3, 0)))
+
+        with self.assertRaises(ValueError):
+            MIPS_Index(np.ones((3, 4)), leaf_size=0)
+
+
+class TestValueFunctionIndex(unittest.TestCase):
+    def test_opt_in(self):
+        alphas = [Alpha(rnd.randint(4), rnd.randn(5)) for _ in range(500)]
+        vf = ValueFunction(alphas, 10)
+
+        with mock.patch('rl_rpsr.value_function.MIPS_Index') as mock_index:
+            vf.policy(rnd.dirichlet(np.ones(5)))
+        mock_index.assert_not_called()
+
+    def test_policy(self):
+        alphas = [Alpha(rnd.randint(4), rnd.randn(5)) for _ in range(500)]
+        vf = ValueFunction(alphas, 10)
+        vf_index = ValueFunction(alphas, 10)
+        vf_index.index_threshold = 1
+
+        for state in rnd.dirichlet(np.ones(5), size=50):
+            self.assertEqual(vf_index.policy(state), vf.policy(state))
+            self.assertAlmostEqual(vf_index.value(state), vf.value(state))
+
+
+if __name__ == '__main__':
+    unittest.main()
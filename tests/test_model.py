@@ -0,0 +1,105 @@
+import unittest
+
+import numpy as np
+import numpy.random as rnd
+import rl_rpsr.testing as testing
+from rl_rpsr import bsr, core, psr, rpsr
+from rl_rpsr.util import SearchType
+
+
+def make_models(num_states=6, rank=3):
+    pomdp_model = testing.random_pomdp_model(num_states, 2, 3, rank=rank)
+    Q = psr.searcher_factory(SearchType.BFS).search(pomdp_model)
+    I = rpsr.searcher_factory(SearchType.BFS).search(pomdp_model)
+    return {
+        'bsr': bsr.BSR_Model(pomdp_model),
+        'psr': psr.PSR_Model(pomdp_model, Q),
+        'rpsr': rpsr.RPSR_Model(pomdp_model, I),
+    }
+
+
+def outcome_matrix(model):
+    if isinstance(model, psr.PSR_Model):
+        return model.U
+    if isinstance(model, rpsr.RPSR_Model):
+        return model.V
+    return np.eye(model.rank)
+
+
+class TestProject(unittest.TestCase):
+    def test_valid(self):
+        for key, model in make_models().items():
+            beliefs = rnd.dirichlet(np.ones(6), size=100)
+            for state in beliefs @ outcome_matrix(model):
+                np.testing.assert_array_equal(
+                    model.project(state), state, err_msg=key
+                )
+
+    def test_invalid(self):
+        for key, model in make_models().items():
+            state = model.start + rnd.randn(model.rank)
+            state_projected = model.project(state)
+
+            self.assertFalse(np.allclose(state_projected, state), msg=key)
+            np.testing.assert_array_equal(
+                model.project(state_projected), state_projected, err_msg=key
+            )
+
+
+class TestNormalize(unittest.TestCase):
+    def test_normalize(self):
+        for key, model in make_models().items():
+            state = model.normalize(2.0 * model.start)
+            np.testing.assert_allclose(state, model.start, err_msg=key)
+            for action in range(model.action_space.n):
+                self.assertAlmostEqual(
+                    model.observation_probs(state, action).sum(), 1.0, msg=key
+                )
+
+    def test_truncated(self):
+        # a single test does not span the ones vector
+        pomdp_model = testing.random_pomdp_model(4, 2, 2)
+        Q = core.Tests((core.Interaction(0, 0).as_test(),))
+        with self.assertLogs('rl_rpsr.psr.model', 'WARNING'):
+            model = psr.PSR_Model(pomdp_model, Q)
+
+        state = model.normalize(3.0 * model.start)
+        for action in range(model.action_space.n):
+            self.assertAlmostEqual(
+                model.observation_probs(state, action).sum(), 1.0
+            )
+
+
+class TestEnvProjection(unittest.TestCase):
+    def test_projection_period(self):
+        envs = {'bsr': bsr.BSR, 'psr': psr.PSR, 'rpsr': rpsr.RPSR}
+        for key, model in make_models().items():
+            env = envs[key](model, seed=0)
+            env_projected = envs[key](model, seed=0, projection_period=1)
+
+            env.reset()
+            env_projected.reset()
+            for t in range(50):
+                action = t % 2
+                state, reward, _, info = env.step(action)
+                state_projected, reward_projected, _, info_projected = (
+                    env_projected.step(action)
+                )
+
+                # projection never changes the (valid) states of the model
+                self.assertEqual(
+                    info['observation'], info_projected['observation']
+                )
+                self.assertAlmostEqual(reward, reward_projected, msg=key)
+                np.testing.assert_allclose(
+                    state, state_projected, atol=1e-9, err_msg=key
+                )
+
+    def test_invalid_period(self):
+        model = make_models()['bsr']
+        with self.assertRaises(ValueError):
+            bsr.BSR(model, projection_period=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
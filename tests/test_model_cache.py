@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import rl_rpsr.testing as testing
+from rl_rpsr import model_cache, psr
+from rl_rpsr.model_cache import ModelCache, make_model
+from rl_rpsr.util import SearchType
+
+
+class TestModelCache(unittest.TestCase):
+    def setUp(self):
+        self.pomdp_model = testing.random_pomdp_model(5, 2, 3)
+        self.Q = psr.searcher_factory(SearchType.BFS).search(self.pomdp_model)
+
+    def test_roundtrip(self):
+        with tempfile.TemporaryDirectory() as dirname:
+            model = make_model(psr.PSR_Model, self.pomdp_model, self.Q, dirname)
+
+            cache = ModelCache(dirname)
+            path = cache.path(psr.PSR_Model, self.pomdp_model, self.Q)
+            self.assertTrue(os.path.isdir(path))
+
+            with mock.patch.object(
+                psr.PSR_Model, '__init__', side_effect=AssertionError
+            ):
+                model_cached = cache.load(
+                    psr.PSR_Model, self.pomdp_model, self.Q
+                )
+
+            for name in psr.PSR_Model.ARRAYS:
+                array = getattr(model_cached, name)
+                self.assertIsInstance(array, np.memmap)
+                np.testing.assert_array_equal(
+                    array, getattr(model, name), err_msg=name
+                )
+
+    def test_key(self):
+        cache = ModelCache(tempfile.gettempdir())
+        path = cache.path(psr.PSR_Model, self.pomdp_model, self.Q)
+
+        # same content, same key
+        pomdp_model = testing.random_pomdp_model(5, 2, 3)
+        env = pomdp_model.env
+        for name in ['start', 'T', 'O', 'R']:
+            setattr(env, name, getattr(self.pomdp_model.env, name).copy())
+        self.assertEqual(cache.path(psr.PSR_Model, pomdp_model, self.Q), path)
+
+        # different content, different key
+        env.R = env.R + 1.0
+        self.assertNotEqual(
+            cache.path(psr.PSR_Model, pomdp_model, self.Q), path
+        )
+
+        # different format version, different key
+        with mock.patch.object(
+            model_cache, 'FORMAT_VERSION', model_cache.FORMAT_VERSION + 1
+        ):
+            self.assertNotEqual(
+                cache.path(psr.PSR_Model, self.pomdp_model, self.Q), path
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import types
+import unittest
+
+import numpy as np
+import numpy.random as rnd
+import rl_rpsr.testing as testing
+from rl_rpsr.policy import CheckedPolicy, Policy, RandomPolicy
+
+
+class ScriptedPolicy(Policy):
+    def __init__(self, actions):
+        self.actions = actions
+        self.index = 0
+
+    def reset(self) -> int:
+        self.index = 0
+        return self.actions[0]
+
+    def step(self, action: int, observation: int) -> int:
+        self.index += 1
+        return self.actions[self.index]
+
+
+class TestCheckedPolicy(unittest.TestCase):
+    def test_agreement(self):
+        policy = ScriptedPolicy([0, 1, 1, 0])
+        reference = ScriptedPolicy([0, 1, 0, 1])
+        checked = CheckedPolicy(policy, reference)
+
+        self.assertTrue(np.isnan(checked.agreement))
+
+        action = checked.reset()
+        for _ in range(3):
+            action = checked.step(action, 0)
+
+        self.assertEqual(action, 0)
+        self.assertEqual(checked.num_steps, 4)
+        self.assertEqual(checked.agreement, 0.5)
+
+
+class TestRandomPolicy(unittest.TestCase):
+    def test_seed(self):
+        model = types.SimpleNamespace(action_space=types.SimpleNamespace(n=4))
+        policy = RandomPolicy(model, seed=0)
+        actions = [policy.reset()] + [policy.step(0, 0) for _ in range(20)]
+
+        policy.seed(0)
+        self.assertListEqual(
+            [policy.reset()] + [policy.step(0, 0) for _ in range(20)], actions
+        )
+        self.assertTrue(all(0 <= action < 4 for action in actions))
+
+
+class TestValueFunctionPrecision(unittest.TestCase):
+    def test_astype(self):
+        vf = testing.random_value_function(10, 3, 4)
+        vf32 = vf.astype(np.float32)
+
+        self.assertIs(vf.astype(np.float64), vf)
+        self.assertEqual(vf32.matrix.dtype, np.float32)
+        np.testing.assert_allclose(vf32.matrix, vf.matrix, rtol=1e-6)
+
+        for state in rnd.dirichlet(np.ones(4), size=10):
+            self.assertAlmostEqual(
+                vf32.value(state.astype(np.float32)), vf.value(state), 5
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
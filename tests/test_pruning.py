@@ -1,8 +1,20 @@
 import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
 
 import numpy as np
 import numpy.random as rnd
-from rl_rpsr.pruning import purge
+from rl_rpsr.pruning import (
+    PurgeStats,
+    WitnessStore,
+    _corner_maximizers,
+    _screen_indices,
+    deduplicate,
+    geometric_candidates,
+    purge,
+    sample_points,
+)
+from rl_rpsr.shared import SharedArrays
 
 
 class TestPurge(unittest.TestCase):
@@ -95,6 +107,272 @@ class TestPurge(unittest.TestCase):
 
         self.assertContainerSubset(vectors_purged, vectors_hi)
 
+    def test_screening(self):
+        ndim = 4
+        I = np.eye(ndim)
+
+        vectors = [rnd.randn(ndim) for _ in range(50)]
+        vectors_purged = purge(vectors, I)
+
+        X = sample_points(I, 100)
+        indices = _screen_indices(np.stack(vectors), X)
+        vectors_screened = [vectors[i] for i in indices]
+
+        self.assertContainerSubset(vectors_screened, vectors_purged)
+
+    def test_screening_ties(self):
+        I = np.eye(3)
+
+        vectors = [np.array([1.0, 0.0, 0.0]), np.array([1.0, 0.0, 0.0])]
+        indices = _screen_indices(np.stack(vectors), sample_points(I, 10))
+
+        self.assertSetEqual(indices, set())
+
+    def test_approximate(self):
+        I = np.eye(2)
+
+        vectors = [np.array([1.0, 0.0]), np.array([0.0, 1.0])]
+        vector = np.array([0.55, 0.55])
+
+        vectors_purged = purge(vectors + [vector], I)
+        self.assertContainerEqual(vectors_purged, vectors + [vector])
+
+        vectors_purged = purge(vectors + [vector], I, eps=0.1)
+        self.assertContainerEqual(vectors_purged, vectors)
+
+    def test_stats(self):
+        ndim = 4
+        I = np.eye(ndim)
+
+        vectors = [rnd.randn(ndim) for _ in range(20)]
+        vectors.extend(vector.copy() for vector in vectors[:5])
+        vectors.append(np.full(ndim, -100.0))
+
+        stats = PurgeStats()
+        vectors_purged = purge(vectors, I, stats=stats)
+
+        self.assertEqual(stats.num_input, 26)
+        self.assertEqual(stats.num_duplicates, 5)
+        self.assertGreaterEqual(stats.num_dominated, 1)
+        self.assertEqual(stats.num_output, len(vectors_purged))
+
+    def test_bounded(self):
+        I = np.eye(2)
+
+        vectors = [np.array([1.0, 0.0]), np.array([0.0, 1.0])]
+        vector = np.array([0.95, 0.05])
+
+        stats = PurgeStats()
+        vectors_purged = purge(
+            vectors + [vector], I, eps=0.1, backend='lp', stats=stats
+        )
+
+        self.assertContainerEqual(vectors_purged, vectors)
+        self.assertEqual(stats.num_bounded, 1)
+        self.assertEqual(stats.num_lps, 0)
+
+    def test_corner_maximizers(self):
+        values = np.array([[0.0, 0.0, 1.0], [0.0, 1.0, 1.0]])
+        self.assertListEqual(_corner_maximizers(values).tolist(), [1, 1, 1])
+
+    def test_executor(self):
+        ndim = 5
+        I = np.eye(ndim)
+
+        beliefs = rnd.dirichlet(np.ones(ndim), size=50)
+        vectors = beliefs / np.linalg.norm(beliefs, axis=1, keepdims=True)
+        vectors = list(vectors - 0.05 * rnd.rand(50, 1))
+
+        vectors_serial = purge(vectors, I, backend='lp')
+        for executor_cls in [ThreadPoolExecutor, ProcessPoolExecutor]:
+            with executor_cls(2) as executor:
+                vectors_parallel = purge(
+                    vectors, I, backend='lp', executor=executor, batch_size=4
+                )
+
+            self.assertContainerEqual(vectors_parallel, vectors_serial)
+
+    def test_executor_publish(self):
+        ndim = 5
+        I = np.eye(ndim)
+
+        beliefs = rnd.dirichlet(np.ones(ndim), size=50)
+        vectors = beliefs / np.linalg.norm(beliefs, axis=1, keepdims=True)
+        vectors = list(vectors - 0.05 * rnd.rand(50, 1))
+
+        publish = mock.patch.object(
+            SharedArrays, 'publish', wraps=SharedArrays.publish
+        )
+        with ProcessPoolExecutor(2) as executor:
+            # no LP, nothing to publish
+            with publish as mock_publish:
+                purge(list(I), I, executor=executor)
+            mock_publish.assert_not_called()
+
+            # an already shared U is referenced, not published again
+            with SharedArrays.publish({'U': I}) as shared:
+                with publish as mock_publish:
+                    vectors_parallel = purge(
+                        vectors, shared['U'], backend='lp', executor=executor
+                    )
+
+                mock_publish.assert_called_once()
+                (arrays,), _ = mock_publish.call_args
+                self.assertListEqual(list(arrays), ['alphas'])
+
+        vectors_serial = purge(vectors, I, backend='lp')
+        self.assertContainerEqual(vectors_parallel, vectors_serial)
+
+    def test_sharded(self):
+        ndim = 4
+        I = np.eye(ndim)
+
+        beliefs = rnd.dirichlet(np.ones(ndim), size=100)
+        vectors = beliefs / np.linalg.norm(beliefs, axis=1, keepdims=True)
+        vectors = list(vectors - 0.05 * rnd.rand(100, 1))
+
+        stats = PurgeStats()
+        vectors_purged = purge(vectors, I)
+        vectors_sharded = purge(vectors, I, shard_size=15, stats=stats)
+
+        self.assertContainerEqual(vectors_sharded, vectors_purged)
+        self.assertEqual(stats.num_purges, 7 + 4 + 2 + 1)
+
+        for executor_cls in [ThreadPoolExecutor, ProcessPoolExecutor]:
+            with executor_cls(2) as executor:
+                vectors_sharded = purge(
+                    vectors, I, shard_size=15, executor=executor
+                )
+
+            self.assertContainerEqual(vectors_sharded, vectors_purged)
+
+    def test_lp_backends(self):
+        ndim = 4
+        I = np.eye(ndim)
+
+        vectors = TestGeometric.make_vectors(ndim, 30)
+        vectors_cvxpy = purge(vectors, I, backend='lp', lp_backend='cvxpy')
+        vectors_scipy = purge(vectors, I, backend='lp', lp_backend='scipy')
+
+        self.assertContainerEqual(vectors_scipy, vectors_cvxpy)
+
+        with self.assertRaises(ValueError):
+            purge(vectors, I, backend='lp', lp_backend='invalid')
+
+    def test_witnesses(self):
+        ndim = 4
+        I = np.eye(ndim)
+
+        witnesses = WitnessStore()
+        vectors = [rnd.randn(ndim) for _ in range(50)]
+        vectors_purged = purge(vectors, I, witnesses=witnesses)
+        vectors_repurged = purge(vectors, I, witnesses=witnesses)
+
+        self.assertContainerEqual(vectors_repurged, vectors_purged)
+
+
+class TestGeometric(unittest.TestCase):
+    @staticmethod
+    def make_vectors(ndim, num_vectors):
+        # tangents of a convex function, and some vectors below them
+        beliefs = rnd.dirichlet(np.ones(ndim), size=num_vectors)
+        vectors = beliefs / np.linalg.norm(beliefs, axis=1, keepdims=True)
+        vectors -= 0.1 * rnd.rand(num_vectors, 1)
+        return list(vectors)
+
+    def test_backends(self):
+        for ndim in [2, 3, 4]:
+            for U in [np.eye(ndim), rnd.dirichlet(np.ones(ndim), size=ndim)]:
+                vectors = self.make_vectors(ndim, 30)
+
+                vectors_lp = purge(vectors, U, backend='lp')
+                vectors_geometric = purge(vectors, U, backend='geometric')
+
+                ids_lp = sorted(map(id, vectors_lp))
+                ids_geometric = sorted(map(id, vectors_geometric))
+                self.assertListEqual(ids_geometric, ids_lp)
+
+    def test_rank_2(self):
+        I = np.eye(2)
+
+        vectors = self.make_vectors(2, 50)
+        stats = PurgeStats()
+        purge(vectors, I, backend='geometric', stats=stats)
+
+        self.assertEqual(stats.num_lps, 0)
+
+    def test_lines(self):
+        I = np.eye(2)
+
+        # the third line only touches the envelope at the breakpoint
+        alphas = np.array([[1.0, 0.0], [0.0, 1.0], [0.5, 0.5], [0.4, 0.4]])
+        candidates, X = geometric_candidates(alphas, I)
+
+        self.assertCountEqual(candidates.tolist(), [0, 1])
+        self.assertTupleEqual(X.shape, (2, 2))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            purge([np.zeros(2), np.ones(2)], np.eye(2), backend='invalid')
+
+
+class TestDeduplicate(unittest.TestCase):
+    def test_exact(self):
+        I = np.eye(3)
+
+        vectors = [rnd.randn(3) for _ in range(5)]
+        vectors_dup = vectors + [vector.copy() for vector in vectors[::-1]]
+        vectors_dedup = deduplicate(vectors_dup, I)
+
+        self.assertEqual(len(vectors_dedup), 5)
+        for vector, vector_dedup in zip(vectors, vectors_dedup):
+            self.assertIs(vector_dedup, vector)
+
+    def test_signed_zero(self):
+        I = np.eye(2)
+
+        vectors = [np.array([0.0, 1.0]), np.array([-0.0, 1.0])]
+        self.assertEqual(len(deduplicate(vectors, I)), 1)
+
+    def test_tolerance(self):
+        I = np.eye(2)
+
+        vectors = [np.array([1.0, 2.0]), np.array([1.0 + 1e-12, 2.0])]
+        self.assertEqual(len(deduplicate(vectors, I)), 2)
+        self.assertEqual(len(deduplicate(vectors, I, tol=1e-9)), 1)
+
+
+class TestWitnessStore(unittest.TestCase):
+    def test_dedup(self):
+        witnesses = WitnessStore()
+        witnesses.add(np.array([0.5, 0.5]))
+        witnesses.add(np.array([0.5, 0.5 + 1e-12]))
+        witnesses.add(np.array([0.25, 0.75]))
+
+        self.assertEqual(len(witnesses), 2)
+        self.assertTupleEqual(witnesses.points(2).shape, (2, 2))
+        self.assertIsNone(witnesses.points(3))
+
+    def test_bounded(self):
+        witnesses = WitnessStore(maxsize=3)
+        for x in np.linspace(0.0, 1.0, 10):
+            witnesses.add(np.array([x, 1.0 - x]))
+
+        self.assertEqual(len(witnesses), 3)
+        np.testing.assert_allclose(witnesses.points(2)[:, 0], [7 / 9, 8 / 9, 1])
+
+    def test_aging(self):
+        witnesses = WitnessStore(max_age=1)
+        witnesses.add(np.array([0.5, 0.5]))
+        witnesses.add(np.array([0.25, 0.75]))
+
+        witnesses.step()
+        witnesses.points(2)
+        witnesses.touch([1])
+        witnesses.step()
+
+        np.testing.assert_allclose(witnesses.points(2), [[0.25, 0.75]])
+
 
 if __name__ == '__main__':
     unittest.main()
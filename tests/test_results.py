@@ -0,0 +1,135 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import numpy.random as rnd
+from rl_rpsr.results import (
+    OnlineStats,
+    ResultsWriter,
+    error_stats,
+    is_results_file,
+    read_results,
+)
+
+
+class TestResultsWriter(unittest.TestCase):
+    def test_roundtrip(self):
+        models = ['bsr', 'psr', 'rpsr']
+        returns = rnd.randn(10, len(models))
+
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, 'results.npy')
+            with ResultsWriter(filename, models, chunk_size=3) as writer:
+                for i, row in enumerate(returns):
+                    writer.write(
+                        'pomdp', 'rpsr', 'random', i, dict(zip(models, row))
+                    )
+
+            self.assertTrue(is_results_file(filename))
+
+            chunks = list(read_results(filename))
+            self.assertListEqual([len(chunk) for chunk in chunks], [3, 3, 3, 1])
+
+            records = np.concatenate(chunks)
+            np.testing.assert_array_equal(records['simulation'], np.arange(10))
+            for j, model in enumerate(models):
+                np.testing.assert_array_equal(records[model], returns[:, j])
+
+    def test_append(self):
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, 'results.npy')
+            for policy in ['random', 'bsr']:
+                with ResultsWriter(filename, ['bsr']) as writer:
+                    writer.write('pomdp', 'rpsr', policy, 0, {'bsr': 1.0})
+
+            records = np.concatenate(list(read_results(filename)))
+            self.assertListEqual(list(records['policy']), ['random', 'bsr'])
+
+    def test_missing(self):
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, 'results.npy')
+            with ResultsWriter(filename, ['bsr', 'psr']) as writer:
+                writer.write('pomdp', 'rpsr', 'random', 0, {'bsr': 1.0})
+
+            (records,) = read_results(filename)
+            self.assertTrue(np.isnan(records['psr'][0]))
+
+    def test_long_name(self):
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, 'results.npy')
+            with ResultsWriter(filename, ['bsr']) as writer:
+                with self.assertRaises(ValueError):
+                    writer.write('p' * 65, 'rpsr', 'random', 0, {'bsr': 1.0})
+
+                writer.write('p' * 64, 'rpsr', 'random', 0, {'bsr': 1.0})
+
+            (records,) = read_results(filename)
+            self.assertEqual(records['pomdp'][0], 'p' * 64)
+
+    def test_text(self):
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, 'results.txt')
+            with open(filename, 'w') as f:
+                print('rpsr random bsr 1.0', file=f)
+
+            self.assertFalse(is_results_file(filename))
+
+
+class TestOnlineStats(unittest.TestCase):
+    def test_stats(self):
+        values = rnd.randn(1_000) + 10.0
+
+        stats = OnlineStats()
+        for chunk in np.array_split(values, 7):
+            stats.update(chunk)
+
+        self.assertEqual(stats.count, values.size)
+        self.assertAlmostEqual(stats.mean, values.mean())
+        self.assertAlmostEqual(stats.std(), values.std(ddof=1))
+        self.assertAlmostEqual(stats.rms(), np.sqrt((values ** 2).mean()))
+
+    def test_empty(self):
+        stats = OnlineStats()
+
+        self.assertTrue(np.isnan(stats.std()))
+        self.assertTrue(np.isnan(stats.rms()))
+
+        stats.update([1.0])
+        self.assertEqual(stats.mean, 1.0)
+        self.assertTrue(np.isnan(stats.std()))
+
+
+class TestErrorStats(unittest.TestCase):
+    def test_mixed(self):
+        # a first run with all models, then one without psr appended
+        returns = rnd.randn(2, 10, 3)
+        returns[1, :, 1] = np.nan
+        models = ['bsr', 'psr', 'rpsr']
+
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, 'results.npy')
+            for run in returns:
+                with ResultsWriter(filename, models, chunk_size=4) as writer:
+                    for i, row in enumerate(run):
+                        writer.write(
+                            'pomdp', 'rpsr', 'bsr', i, dict(zip(models, row))
+                        )
+
+            stats = error_stats(read_results(filename), models)
+
+        errors = returns[..., :1] - returns
+        self.assertEqual(stats['bsr'].count, 20)
+        self.assertEqual(stats['psr'].count, 10)
+        self.assertEqual(stats['rpsr'].count, 20)
+        self.assertEqual(stats['bsr'].rms(), 0.0)
+        self.assertAlmostEqual(
+            stats['psr'].rms(), np.sqrt((errors[0, :, 1] ** 2).mean())
+        )
+        self.assertAlmostEqual(
+            stats['rpsr'].rms(), np.sqrt((errors[..., 2] ** 2).mean())
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
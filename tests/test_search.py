@@ -0,0 +1,237 @@
+import itertools
+import unittest
+
+import numpy as np
+import rl_rpsr.testing as testing
+from rl_rpsr import core, psr, rpsr
+from rl_rpsr.psr.search import outcome_matrix as psr_outcome_matrix
+from rl_rpsr.rpsr.search import outcome_matrix as rpsr_outcome_matrix
+from rl_rpsr.search import SearchStats, joint_searcher_factory, search_dfs
+from rl_rpsr.util import SearchType, interactions
+
+
+def make_pomdp_models():
+    return {
+        'full': testing.random_pomdp_model(4, 2, 2),
+        'low-rank': testing.random_pomdp_model(6, 2, 3, rank=3),
+    }
+
+
+def all_outcomes(model, max_length):
+    """(|S|, K, 1 + |A|) outcomes of all the tests up to `max_length`."""
+    W = np.column_stack([np.ones(model.state_space.n), model.R])
+    level = [W]
+    outcomes = [W]
+    for _ in range(max_length):
+        level = [
+            model.G[i.action, i.observation].T @ W
+            for W, i in itertools.product(
+                level, interactions(model.action_space, model.observation_space)
+            )
+        ]
+        outcomes.extend(level)
+
+    return np.stack(outcomes, axis=1)
+
+
+class SpanMixin:
+    def assertSameSpan(self, A, B, msg=None):
+        rank = np.linalg.matrix_rank(A)
+        self.assertEqual(rank, np.linalg.matrix_rank(B), msg=msg)
+        self.assertEqual(
+            rank, np.linalg.matrix_rank(np.column_stack([A, B])), msg=msg
+        )
+
+
+class TestJointSearcher(SpanMixin, unittest.TestCase):
+
+    def test_cores(self):
+        for key, model in make_pomdp_models().items():
+            Q_ref = psr.searcher_factory(SearchType.BFS).search(model)
+            I_ref = rpsr.searcher_factory(SearchType.BFS).search(model)
+            U_ref = psr_outcome_matrix(model, Q_ref)
+            V_ref = rpsr_outcome_matrix(model, I_ref)
+
+            for search_type in [SearchType.BFS, SearchType.DFS]:
+                msg = f'{key} {search_type}'
+                Q, I = joint_searcher_factory(search_type).search(model)
+
+                U = psr_outcome_matrix(model, Q)
+                V = rpsr_outcome_matrix(model, I)
+                self.assertEqual(len(Q), np.linalg.matrix_rank(U), msg=msg)
+                self.assertEqual(len(I), np.linalg.matrix_rank(V), msg=msg)
+                self.assertSameSpan(U, U_ref, msg=msg)
+                self.assertSameSpan(V, V_ref, msg=msg)
+
+
+class TestSearchDFS(unittest.TestCase):
+    def setUp(self):
+        # 4 interactions
+        self.model = testing.random_pomdp_model(2, 2, 2)
+
+    def test_depth_first(self):
+        visited = []
+
+        def visit(test):
+            visited.append(test)
+            return True
+
+        stats = SearchStats()
+        search_dfs(self.model, visit, stats, max_depth=2)
+
+        self.assertEqual(len(visited), 1 + 4 + 4**2)
+        self.assertEqual(len(set(visited)), len(visited))
+        self.assertEqual(visited[0], core.Test.empty())
+        self.assertEqual(visited[2].tail, visited[1])
+        self.assertEqual(max(len(test) for test in visited), 2)
+
+        self.assertEqual(stats.num_nodes, len(visited))
+        self.assertEqual(stats.max_depth, 2)
+        self.assertEqual(stats.num_cutoffs, 4**3)
+        self.assertFalse(stats.exhausted)
+
+    def test_pruned(self):
+        visited = []
+
+        def visit(test):
+            visited.append(test)
+            return test.tail is None
+
+        stats = SearchStats()
+        search_dfs(self.model, visit, stats)
+
+        self.assertEqual(len(visited), 1 + 4)
+        self.assertEqual(stats.num_nodes, 1 + 4)
+        self.assertEqual(stats.max_depth, 1)
+        self.assertEqual(stats.num_cutoffs, 0)
+        self.assertFalse(stats.exhausted)
+
+    def test_max_nodes(self):
+        visited = []
+
+        def visit(test):
+            visited.append(test)
+            return True
+
+        stats = SearchStats()
+        search_dfs(self.model, visit, stats, max_nodes=5)
+
+        self.assertEqual(len(visited), 5)
+        self.assertEqual(stats.num_nodes, 5)
+        self.assertTrue(stats.exhausted)
+
+
+class TestDFS_Searchers(SpanMixin, unittest.TestCase):
+    def setUp(self):
+        self.pomdp_models = {
+            'full': testing.random_pomdp_model(4, 2, 2),
+            'low-rank': testing.random_pomdp_model(5, 2, 2, rank=2),
+        }
+
+    def test_span(self):
+        # the outcomes of longer tests are in the span of the shorter ones
+        for key, model in self.pomdp_models.items():
+            W = all_outcomes(model, model.state_space.n)
+            U_all = W[:, :, 0]
+            V_all = W.reshape(model.state_space.n, -1)
+
+            Q = psr.searcher_factory(SearchType.DFS).search(model)
+            I = rpsr.searcher_factory(SearchType.DFS).search(model)
+            self.assertSameSpan(psr_outcome_matrix(model, Q), U_all, msg=key)
+            self.assertSameSpan(rpsr_outcome_matrix(model, I), V_all, msg=key)
+
+            Q, I = joint_searcher_factory(SearchType.DFS).search(model)
+            self.assertSameSpan(psr_outcome_matrix(model, Q), U_all, msg=key)
+            self.assertSameSpan(rpsr_outcome_matrix(model, I), V_all, msg=key)
+
+    def test_stats(self):
+        num_interactions = 4
+        for key, model in self.pomdp_models.items():
+            # the root and each core test are expanded, once
+            searcher = psr.searcher_factory(SearchType.DFS)
+            Q = searcher.search(model)
+            stats = searcher.stats
+            self.assertEqual(stats.num_added, len(Q), msg=key)
+            self.assertLessEqual(stats.num_checks, stats.num_nodes - 1, msg=key)
+            self.assertEqual(
+                stats.num_nodes, 1 + num_interactions * (1 + len(Q)), msg=key
+            )
+            self.assertEqual(
+                stats.max_depth, 1 + max(len(test) for test in Q), msg=key
+            )
+            self.assertEqual(stats.num_cutoffs, 0, msg=key)
+            self.assertFalse(stats.exhausted, msg=key)
+
+            # the tests with an intent in the core are expanded
+            searcher = rpsr.searcher_factory(SearchType.DFS)
+            I = searcher.search(model)
+            tests = {intent.test for intent in I}
+            stats = searcher.stats
+            self.assertEqual(stats.num_added, len(I), msg=key)
+            self.assertEqual(
+                stats.num_nodes, 1 + num_interactions * len(tests), msg=key
+            )
+            self.assertEqual(
+                stats.max_depth, 1 + max(len(test) for test in tests), msg=key
+            )
+
+            searcher = joint_searcher_factory(SearchType.DFS)
+            Q, I = searcher.search(model)
+            self.assertEqual(searcher.stats.num_added, len(Q) + len(I), msg=key)
+
+    def test_max_depth(self):
+        model = self.pomdp_models['full']
+        Q = psr.searcher_factory(SearchType.DFS).search(model)
+        I = rpsr.searcher_factory(SearchType.DFS).search(model)
+
+        for max_depth in [0, 1]:
+            factories = [
+                (psr.searcher_factory, len(Q)),
+                (rpsr.searcher_factory, len(I)),
+                (joint_searcher_factory, len(Q) + len(I)),
+            ]
+            for factory, size in factories:
+                searcher = factory(SearchType.BOUNDED_DFS, max_depth=max_depth)
+                ret = searcher.search(model)
+                if isinstance(ret, tuple):
+                    Q_bounded, I_bounded = ret
+                    tests = list(Q_bounded) + [i.test for i in I_bounded]
+                else:
+                    tests = [getattr(x, 'test', x) for x in ret]
+
+                msg = f'{factory.__module__} {max_depth}'
+                self.assertLessEqual(searcher.stats.max_depth, max_depth, msg)
+                self.assertGreater(searcher.stats.num_cutoffs, 0, msg=msg)
+                self.assertTrue(
+                    all(len(test) <= max_depth for test in tests), msg=msg
+                )
+                self.assertLessEqual(searcher.stats.num_added, size, msg=msg)
+
+    def test_max_nodes(self):
+        model = self.pomdp_models['full']
+        for factory in [
+            psr.searcher_factory,
+            rpsr.searcher_factory,
+            joint_searcher_factory,
+        ]:
+            searcher = factory(SearchType.BOUNDED_DFS, max_nodes=3)
+            searcher.search(model)
+
+            msg = factory.__module__
+            self.assertEqual(searcher.stats.num_nodes, 3, msg=msg)
+            self.assertTrue(searcher.stats.exhausted, msg=msg)
+            self.assertLessEqual(searcher.stats.num_checks, 3 * 4, msg=msg)
+
+    def test_invalid_bounds(self):
+        with self.assertRaises(ValueError):
+            joint_searcher_factory(SearchType.BOUNDED_DFS)
+
+        with self.assertRaises(ValueError):
+            psr.searcher_factory(SearchType.BOUNDED_DFS, max_depth=-1)
+
+        with self.assertRaises(ValueError):
+            rpsr.searcher_factory(SearchType.BOUNDED_DFS, max_nodes=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
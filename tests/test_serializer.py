@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+import rl_rpsr.testing as testing
+from rl_rpsr.core import Intent, Intents, Test, Tests
+from rl_rpsr.serializer import (
+    CoreSerializer,
+    IntentsSerializer,
+    TestsSerializer,
+    is_binary_core,
+)
+
+
+def random_tests(num_tests):
+    tests = [Test.empty()]
+    tests.extend(testing.random_test(i, 3, 4) for i in range(1, num_tests))
+    return Tests(tuple(tests))
+
+
+def random_intents(num_intents):
+    intents = [Intent.testless(0), Intent.actionless(Test.empty())]
+    intents.extend(
+        testing.random_intent(i, 3, 4) for i in range(1, num_intents - 1)
+    )
+    return Intents(tuple(intents))
+
+
+class TestCoreSerializers(unittest.TestCase):
+    def test_tests(self):
+        Q = random_tests(10)
+
+        with tempfile.TemporaryDirectory() as dirname:
+            for basename in ['core.yaml', 'core.npz']:
+                filename = os.path.join(dirname, basename)
+                TestsSerializer().dump(filename, Q)
+
+                self.assertEqual(
+                    is_binary_core(filename), basename.endswith('.npz')
+                )
+                self.assertEqual(TestsSerializer().load(filename), Q)
+
+    def test_intents(self):
+        I = random_intents(10)
+
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, 'core')
+            IntentsSerializer().dump(filename, I, fmt='npz')
+
+            self.assertTrue(is_binary_core(filename))
+            self.assertEqual(IntentsSerializer().load(filename), I)
+            self.assertEqual(CoreSerializer().load(filename), I)
+
+    def test_convert(self):
+        I = random_intents(10)
+
+        with tempfile.TemporaryDirectory() as dirname:
+            filename_yaml = os.path.join(dirname, 'core.yaml')
+            filename_npz = os.path.join(dirname, 'core.npz')
+
+            CoreSerializer().dump(filename_yaml, I)
+            core = CoreSerializer().load(filename_yaml)
+            CoreSerializer().dump(filename_npz, core)
+            core = CoreSerializer().load(filename_npz)
+            CoreSerializer().dump(filename_yaml, core)
+
+            self.assertEqual(CoreSerializer().load(filename_yaml), I)
+
+    def test_type(self):
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, 'core.npz')
+            TestsSerializer().dump(filename, random_tests(3))
+
+            with self.assertRaises(TypeError):
+                IntentsSerializer().load(filename)
+
+            with self.assertRaises(ValueError):
+                TestsSerializer().dump(filename, random_tests(3), fmt='bin')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import pickle
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+import numpy as np
+import numpy.random as rnd
+import rl_rpsr.testing as testing
+from rl_rpsr import psr
+from rl_rpsr.shared import (
+    LazySharedArrays,
+    SharedArrays,
+    attach_model,
+    attach_refs,
+    publish_model,
+)
+from rl_rpsr.util import SearchType
+
+
+def _sum(handle):
+    arrays = SharedArrays.attach(handle)
+    return {key: array.sum() for key, array in arrays.items()}
+
+
+def _sum_refs(refs):
+    return {key: array.sum() for key, array in attach_refs(refs).items()}
+
+
+class TestSharedArrays(unittest.TestCase):
+    def test_publish(self):
+        arrays = {
+            'G': rnd.randn(2, 3, 4, 4),
+            'index': np.arange(5, dtype=np.int32),
+            'empty': np.empty((0, 3)),
+        }
+
+        with SharedArrays.publish(arrays) as shared:
+            self.assertListEqual(list(shared), list(arrays))
+            for key, array in arrays.items():
+                self.assertEqual(shared[key].dtype, array.dtype)
+                np.testing.assert_array_equal(shared[key], array)
+
+            self.assertEqual(shared['G'].ctypes.data % 64, 0)
+            self.assertEqual(shared['index'].ctypes.data % 64, 0)
+
+    def test_readonly(self):
+        with SharedArrays.publish({'x': np.zeros(3)}) as shared:
+            with self.assertRaises(ValueError):
+                shared['x'][0] = 1.0
+
+    def test_objects(self):
+        with self.assertRaises(ValueError):
+            SharedArrays.publish({'x': np.array([None])})
+
+    def test_attach(self):
+        arrays = {'x': rnd.randn(10, 3), 'y': rnd.randn(7)}
+
+        with SharedArrays.publish(arrays) as shared:
+            handle = pickle.loads(pickle.dumps(shared.handle))
+            with ProcessPoolExecutor(1) as executor:
+                sums = executor.submit(_sum, handle).result()
+
+        for key, array in arrays.items():
+            self.assertAlmostEqual(sums[key], array.sum())
+
+    def test_close(self):
+        shared = SharedArrays.publish({'x': np.zeros(3)})
+        handle = shared.handle
+        shared.close()
+        shared.close()
+
+        with self.assertRaises(FileNotFoundError):
+            SharedArrays.attach(handle)
+
+
+class TestLazySharedArrays(unittest.TestCase):
+    def test_refs(self):
+        x, y = rnd.randn(4), rnd.randn(3)
+
+        with mock.patch.object(
+            SharedArrays, 'publish', wraps=SharedArrays.publish
+        ) as mock_publish:
+            with SharedArrays.publish({'x': x}) as shared:
+                mock_publish.reset_mock()
+                with LazySharedArrays({'x': shared['x'], 'y': y}) as lazy:
+                    mock_publish.assert_not_called()
+
+                    refs = lazy.refs()
+                    self.assertIs(lazy.refs(), refs)
+                    mock_publish.assert_called_once()
+
+                    self.assertEqual(refs['x'], (shared.handle, 'x'))
+                    self.assertNotEqual(refs['y'][0], shared.handle)
+
+                    with ProcessPoolExecutor(1) as executor:
+                        sums = executor.submit(_sum_refs, refs).result()
+
+        self.assertAlmostEqual(sums['x'], x.sum())
+        self.assertAlmostEqual(sums['y'], y.sum())
+
+    def test_unused(self):
+        with mock.patch.object(SharedArrays, 'publish') as mock_publish:
+            with LazySharedArrays({'x': np.zeros(3)}):
+                pass
+
+        mock_publish.assert_not_called()
+
+
+class TestPublish(unittest.TestCase):
+    def test_model(self):
+        pomdp_model = testing.random_pomdp_model(5, 2, 3)
+        Q = psr.searcher_factory(SearchType.BFS).search(pomdp_model)
+        model = psr.PSR_Model(pomdp_model, Q)
+
+        with publish_model(model) as shared:
+            model_shared = attach_model(
+                psr.PSR_Model, pomdp_model, shared.handle
+            )
+
+            for name in psr.PSR_Model.ARRAYS:
+                array = getattr(model_shared, name)
+                self.assertFalse(array.flags.writeable, msg=name)
+                np.testing.assert_array_equal(array, getattr(model, name))
+
+            self.assertEqual(
+                SharedArrays.find(model_shared.U), (shared.handle, 'U')
+            )
+            self.assertIsNone(SharedArrays.find(model.U))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+
+import numpy as np
+import numpy.random as rnd
+import rl_rpsr.testing as testing
+from rl_rpsr import bsr, psr
+from rl_rpsr.util import (
+    SearchType,
+    discounted_returns,
+    episode_seeds,
+    replay,
+    sample_inverse_cdf,
+)
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        pomdp_model = testing.random_pomdp_model(5, 2, 3)
+        Q = psr.searcher_factory(SearchType.BFS).search(pomdp_model)
+        self.models = [
+            bsr.BSR_Model(pomdp_model),
+            psr.PSR_Model(pomdp_model, Q),
+        ]
+
+        self.actions = rnd.randint(2, size=(4, 10))
+        self.observations = rnd.randint(3, size=(4, 10))
+
+    def test_replay(self):
+        for model in self.models:
+            rewards = replay(model, self.actions, self.observations)
+            self.assertEqual(rewards.shape, (4, 10))
+
+            for k in range(4):
+                state = model.start
+                for t in range(10):
+                    action = self.actions[k, t]
+                    self.assertAlmostEqual(
+                        rewards[k, t], model.expected_reward(state, action)
+                    )
+                    state = model.dynamics(
+                        state, action, self.observations[k, t]
+                    )
+
+    def test_representations(self):
+        rewards_bsr, rewards_psr = [
+            replay(model, self.actions, self.observations)
+            for model in self.models
+        ]
+        np.testing.assert_allclose(rewards_bsr, rewards_psr)
+
+    def test_empty(self):
+        for model in self.models:
+            self.assertEqual(
+                replay(model, np.empty((0, 5)), np.empty((0, 5))).shape, (0, 5)
+            )
+            self.assertEqual(
+                replay(model, np.empty((3, 0)), np.empty((3, 0))).shape, (3, 0)
+            )
+
+
+class TestDiscountedReturns(unittest.TestCase):
+    def test_returns(self):
+        rewards = rnd.randn(3, 7)
+        returns = discounted_returns(rewards, 0.9)
+
+        for k in range(3):
+            self.assertAlmostEqual(
+                returns[k], sum(0.9**t * r for t, r in enumerate(rewards[k]))
+            )
+
+
+class TestSampleInverseCDF(unittest.TestCase):
+    def test_distribution(self):
+        probs = np.array([0.2, 0.0, 0.5, 0.3])
+        samples = [sample_inverse_cdf(probs, u) for u in rnd.random(10_000)]
+
+        frequencies = np.bincount(samples, minlength=4) / len(samples)
+        np.testing.assert_allclose(frequencies, probs, atol=0.03)
+        self.assertEqual(frequencies[1], 0.0)
+
+    def test_boundaries(self):
+        probs = np.array([0.0, 1.0, 2.0, 0.0])
+
+        self.assertEqual(sample_inverse_cdf(probs, 0.0), 1)
+        self.assertEqual(sample_inverse_cdf(probs, 1.0 / 3.0), 2)
+        self.assertEqual(sample_inverse_cdf(probs, np.nextafter(1.0, 0.0)), 2)
+
+    def test_monotone(self):
+        probs = rnd.dirichlet(np.ones(5))
+        samples = [sample_inverse_cdf(probs, u) for u in np.linspace(0, 1, 100)]
+
+        self.assertListEqual(samples, sorted(samples))
+
+
+class TestEpisodeSeeds(unittest.TestCase):
+    def test_seeds(self):
+        self.assertEqual(episode_seeds(0, 3), episode_seeds(0, 3))
+        self.assertNotEqual(episode_seeds(0, 3), episode_seeds(0, 4))
+        self.assertNotEqual(episode_seeds(0, 3), episode_seeds(1, 3))
+
+        env_seed, policy_seed = episode_seeds(0, 0)
+        self.assertNotEqual(env_seed, policy_seed)
+
+
+if __name__ == '__main__':
+    unittest.main()